@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
+from airport.booking import release_tickets
 from airport.models import (
     Crew,
     AirplaneType,
@@ -20,6 +22,15 @@ class TicketInLine(admin.TabularInline):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     inlines = (TicketInLine,)
+    actions = ("cancel_orders",)
+
+    @admin.action(description="Cancel selected orders and release seats")
+    def cancel_orders(self, request, queryset):
+        with transaction.atomic():
+            cancelled = release_tickets(
+                Ticket.objects.filter(order__in=queryset)
+            )
+        self.message_user(request, f"{cancelled} ticket(s) cancelled")
 
 
 @admin.register(Airplane)
@@ -40,6 +51,7 @@ class RouteAdmin(admin.ModelAdmin):
 
 @admin.register(Flight)
 class FlightAdmin(admin.ModelAdmin):
+    readonly_fields = ("seats_sold",)
 
     def get_queryset(self, request):
         queryset = super(FlightAdmin, self).get_queryset(request)
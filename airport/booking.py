@@ -0,0 +1,384 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    OperationalError,
+    connection,
+    transaction,
+)
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from airport.models import Airplane, Flight, Order, SeatHold, Ticket
+from airport.utils.flight_cache import flight_cache
+
+UNIQUE_SEAT_MESSAGE = "The fields row, seat, flight must make a unique set."
+HELD_SEAT_MESSAGE = "This seat is held by another customer."
+DEPARTED_MESSAGE = "Tickets of departed flights cannot be cancelled."
+
+
+def load_airplanes(tickets_data):
+    """Collect airplanes of ticket flights, fetching missing in one query"""
+    airplanes = {}
+    for ticket_data in tickets_data:
+        flight = ticket_data["flight"]
+        if Flight.airplane.is_cached(flight):
+            airplanes[flight.airplane_id] = flight.airplane
+
+    missing_ids = {
+        ticket_data["flight"].airplane_id for ticket_data in tickets_data
+    } - airplanes.keys()
+    if missing_ids:
+        airplanes.update(Airplane.objects.in_bulk(missing_ids))
+    return airplanes
+
+
+def seat_range_error(row, seat, airplane):
+    """Build the error of a seat outside of the airplane, if any"""
+    try:
+        Ticket.validate_ticket(
+            row, seat, airplane, serializers.ValidationError
+        )
+    except serializers.ValidationError as error:
+        return error.detail
+    return {}
+
+
+def validate_seat_ranges(tickets_data, airplanes):
+    """Check every ticket against preloaded airplane dimensions"""
+    errors = [
+        seat_range_error(
+            ticket_data["row"],
+            ticket_data["seat"],
+            airplanes[ticket_data["flight"].airplane_id],
+        )
+        for ticket_data in tickets_data
+    ]
+    if any(errors):
+        raise serializers.ValidationError({"tickets": errors})
+
+
+def duplicate_errors(seats):
+    seen = set()
+    errors = []
+    for seat in seats:
+        errors.append(
+            {"non_field_errors": [UNIQUE_SEAT_MESSAGE]} if seat in seen else {}
+        )
+        seen.add(seat)
+    return errors
+
+
+def duplicate_seat_errors(tickets_data):
+    """Build per-ticket errors for seats repeated within the same payload"""
+    return duplicate_errors([
+        (data["flight"].id, data["row"], data["seat"]) for data in tickets_data
+    ])
+
+
+def taken_seat_errors(tickets_data):
+    """Build per-ticket errors for seats that are already sold"""
+    taken = set(
+        Ticket.objects
+        .filter(
+            flight_id__in={data["flight"].id for data in tickets_data},
+            row__in={data["row"] for data in tickets_data},
+            seat__in={data["seat"] for data in tickets_data},
+        )
+        .values_list("flight_id", "row", "seat")
+    )
+    return [
+        {"non_field_errors": [UNIQUE_SEAT_MESSAGE]}
+        if (data["flight"].id, data["row"], data["seat"]) in taken
+        else {}
+        for data in tickets_data
+    ]
+
+
+def seats_filter(seats):
+    """Match exact (flight_id, row, seat) triples with a single query"""
+    return reduce(
+        or_,
+        (
+            Q(flight_id=flight_id, row=row, seat=seat)
+            for flight_id, row, seat in seats
+        ),
+    )
+
+
+def active_holds(seats):
+    """Map (flight_id, row, seat) to the user id holding it"""
+    if not seats:
+        return {}
+    return {
+        (flight_id, row, seat): user_id
+        for flight_id, row, seat, user_id in (
+            SeatHold.objects
+            .filter(seats_filter(seats), expires_at__gt=timezone.now())
+            .values_list("flight_id", "row", "seat", "user_id")
+        )
+    }
+
+
+def held_seat_errors(tickets_data, user):
+    """Build per-ticket errors for seats held by other users"""
+    seats = [
+        (data["flight"].id, data["row"], data["seat"]) for data in tickets_data
+    ]
+    holds = active_holds(seats)
+    return [
+        {"non_field_errors": [HELD_SEAT_MESSAGE]}
+        if holds.get(seat, user.id) != user.id
+        else {}
+        for seat in seats
+    ]
+
+
+def hold_seats(flight, user, seats_data, minutes):
+    """Reserve seats of a flight for a user, refreshing own holds
+
+    Expired holds of other users on the requested seats are replaced.
+    """
+    errors = [
+        seat_range_error(seat_data["row"], seat_data["seat"], flight.airplane)
+        for seat_data in seats_data
+    ]
+    if any(errors):
+        raise serializers.ValidationError({"seats": errors})
+
+    seats = [
+        (flight.id, seat_data["row"], seat_data["seat"])
+        for seat_data in seats_data
+    ]
+    errors = duplicate_errors(seats)
+    if any(errors):
+        raise serializers.ValidationError({"seats": errors})
+
+    taken = set(
+        Ticket.objects
+        .filter(seats_filter(seats))
+        .values_list("flight_id", "row", "seat")
+    )
+    holds = active_holds(seats)
+    errors = [
+        {"non_field_errors": [UNIQUE_SEAT_MESSAGE]}
+        if seat in taken
+        else {"non_field_errors": [HELD_SEAT_MESSAGE]}
+        if holds.get(seat, user.id) != user.id
+        else {}
+        for seat in seats
+    ]
+    if any(errors):
+        raise serializers.ValidationError({"seats": errors})
+
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    try:
+        with transaction.atomic():
+            SeatHold.objects.filter(seats_filter(seats)).filter(
+                Q(user=user) | Q(expires_at__lte=timezone.now())
+            ).delete()
+            return SeatHold.objects.bulk_create([
+                SeatHold(
+                    flight=flight,
+                    row=row,
+                    seat=seat,
+                    user=user,
+                    expires_at=expires_at,
+                )
+                for _, row, seat in seats
+            ])
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"seats": [HELD_SEAT_MESSAGE]}
+        )
+
+
+def release_holds(user, tickets_data):
+    """Drop holds of a user that were converted into tickets"""
+    SeatHold.objects.filter(
+        seats_filter([
+            (data["flight"].id, data["row"], data["seat"])
+            for data in tickets_data
+        ]),
+        user=user,
+    ).delete()
+
+
+def lock_flights(flight_ids):
+    """Serialize ticket writers of the same flights until commit
+
+    BOOKING_LOCK_STRATEGY picks "select_for_update" (row locks on flights),
+    "advisory" (transaction-level advisory locks keyed by flight id, falls
+    back to row locks on other databases) or "none". Locks are taken in id
+    order, so orders spanning several flights cannot deadlock each other.
+    """
+    strategy = getattr(
+        settings, "BOOKING_LOCK_STRATEGY", "select_for_update"
+    )
+    flight_ids = sorted(flight_ids)
+
+    if strategy == "advisory" and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for flight_id in flight_ids:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s)", [flight_id]
+                )
+    elif strategy in ("select_for_update", "advisory"):
+        list(
+            Flight.objects
+            .select_for_update()
+            .filter(id__in=flight_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+
+def create_tickets(order, tickets_data):
+    """Validate and insert all tickets of an order with one bulk INSERT
+
+    Must be called inside a transaction. Keeps Flight.seats_sold in sync,
+    since bulk_create bypasses the Ticket signals.
+    """
+    validate_seat_ranges(tickets_data, load_airplanes(tickets_data))
+    errors = duplicate_seat_errors(tickets_data)
+    if any(errors):
+        raise serializers.ValidationError({"tickets": errors})
+
+    lock_flights({data["flight"].id for data in tickets_data})
+    tickets = [
+        Ticket(order=order, **ticket_data) for ticket_data in tickets_data
+    ]
+    try:
+        with transaction.atomic():
+            tickets = Ticket.objects.bulk_create(tickets)
+    except IntegrityError:
+        errors = taken_seat_errors(tickets_data)
+        if not any(errors):
+            raise
+        raise serializers.ValidationError({"tickets": errors})
+
+    Flight.change_seats_sold(
+        Counter(ticket.flight_id for ticket in tickets)
+    )
+    release_holds(order.user, tickets_data)
+    flight_cache.invalidate(
+        route_ids={data["flight"].route_id for data in tickets_data}
+    )
+    return tickets
+
+
+def retry_lock_conflicts(function, *args):
+    """Call function in a transaction, retrying it on lock conflicts
+
+    Deadlocks, lock timeouts and serialization failures are retried up to
+    BOOKING_MAX_RETRIES times with jittered exponential backoff.
+    """
+    max_retries = getattr(settings, "BOOKING_MAX_RETRIES", 3)
+    delay = getattr(settings, "BOOKING_RETRY_DELAY", 0.05)
+
+    for attempt in range(max_retries + 1):
+        try:
+            with transaction.atomic():
+                return function(*args)
+        except OperationalError:
+            if attempt == max_retries:
+                raise
+            time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def insert_order(tickets_data, order_data):
+    order = Order.objects.create(**order_data)
+    create_tickets(order, tickets_data)
+    return order
+
+
+def create_order(tickets_data, **order_data):
+    """Create an order with its tickets, retrying on lock conflicts
+
+    Seats sold in the meantime are reported as validation errors, not
+    retried.
+    """
+    return retry_lock_conflicts(insert_order, tickets_data, order_data)
+
+
+def release_tickets(tickets):
+    """Delete tickets with one DELETE and release their seats
+
+    Must be called inside a transaction. The DELETE is plain SQL and
+    skips the Ticket signals, so Flight.seats_sold and flight caches are
+    updated here once per flight. Orders left without tickets are deleted.
+    """
+    rows = list(
+        tickets
+        .select_for_update(of=("self",))
+        .order_by()
+        .values_list("id", "order_id", "flight_id", "flight__route_id")
+    )
+    if not rows:
+        return 0
+
+    ticket_ids = [ticket_id for ticket_id, _, _, _ in rows]
+    table = connection.ops.quote_name(Ticket._meta.db_table)
+    batch_size = connection.ops.bulk_batch_size(["id"], ticket_ids)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(ticket_ids), batch_size):
+            batch = ticket_ids[start:start + batch_size]
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN "
+                f"({', '.join(['%s'] * len(batch))})",
+                batch,
+            )
+            deleted += cursor.rowcount
+    Flight.change_seats_sold({
+        flight_id: -count
+        for flight_id, count in Counter(
+            flight_id for _, _, flight_id, _ in rows
+        ).items()
+    })
+    Order.objects.filter(
+        id__in={order_id for _, order_id, _, _ in rows},
+        tickets__isnull=True,
+    ).delete()
+    flight_cache.invalidate(
+        route_ids={route_id for _, _, _, route_id in rows}
+    )
+    return deleted
+
+
+def cancel_order(order, ticket_ids=None):
+    """Cancel a whole order or some of its tickets before departure"""
+    tickets = order.tickets.all()
+    if ticket_ids is not None:
+        tickets = tickets.filter(id__in=ticket_ids)
+        unknown = set(ticket_ids) - set(
+            tickets.values_list("id", flat=True)
+        )
+        if unknown:
+            raise serializers.ValidationError({
+                "tickets": [
+                    f'Invalid ticket id "{ticket_id}" - '
+                    "it does not belong to this order."
+                    for ticket_id in sorted(unknown)
+                ]
+            })
+
+    if tickets.filter(flight__departure_time__lte=timezone.now()).exists():
+        raise serializers.ValidationError({"tickets": [DEPARTED_MESSAGE]})
+
+    with transaction.atomic():
+        return release_tickets(tickets)
+
+
+def cancel_flight(flight):
+    """Cancel all tickets and seat holds of a flight"""
+    with transaction.atomic():
+        SeatHold.objects.filter(flight=flight).delete()
+        return release_tickets(flight.tickets.all())
@@ -0,0 +1,87 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from airport.models import Airport
+from airport.utils.search import MATCH_LOOKUPS, SEARCH_INDEXES
+
+SYLLABLES = (
+    "lon", "don", "par", "is", "ber", "lin", "ma", "drid", "ro", "me",
+    "kyi", "iv", "os", "lo", "vie", "nna", "pra", "gue", "war", "saw",
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare airport search plans with and without
+    the search indexes on a synthetic catalog. All data is rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=10_000)
+        parser.add_argument("--term", default="lon")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        with transaction.atomic():
+            self.create_catalog(options["airports"])
+
+            if connection.vendor == "postgresql":
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    "Without search indexes"
+                ))
+                with transaction.atomic():
+                    for index in SEARCH_INDEXES:
+                        with connection.cursor() as cursor:
+                            cursor.execute(f"DROP INDEX IF EXISTS {index}")
+                    self.explain_lookups(options["term"], options["repeat"])
+                    transaction.set_rollback(True)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    "With search indexes"
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    "Search indexes are created on PostgreSQL only, "
+                    f"{connection.vendor} uses the ORM fallback"
+                ))
+
+            self.explain_lookups(options["term"], options["repeat"])
+            transaction.set_rollback(True)
+
+    def create_catalog(self, count):
+        rng = random.Random(count)
+
+        def word():
+            return "".join(
+                rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))
+            ).capitalize()
+
+        Airport.objects.bulk_create(
+            [
+                Airport(name=f"{word()} Airport", closest_big_city=word())
+                for _ in range(count)
+            ],
+            batch_size=1000,
+        )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE airport_airport")
+
+    def explain_lookups(self, term, repeat):
+        for match, lookup in MATCH_LOOKUPS.items():
+            queryset = Airport.objects.filter(
+                **{f"closest_big_city__{lookup}": term}
+            )
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.values_list("id", flat=True))
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+
+            self.stdout.write(f"{match} ({lookup}): {elapsed:.2f} ms/query")
+            if connection.vendor == "postgresql":
+                self.stdout.write(queryset.explain(analyze=True))
+            else:
+                self.stdout.write(queryset.explain())
@@ -0,0 +1,181 @@
+import random
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.utils import timezone
+from rest_framework import serializers
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Route,
+)
+from airport.serializers.order_serializers import OrderSerializer
+
+
+class Command(BaseCommand):
+    """Django command to book seats of one hot flight from many threads
+    and report throughput, latency and conflicts. Created data is deleted."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seats-per-order", type=int, default=2)
+        parser.add_argument("--rows", type=int, default=30)
+        parser.add_argument("--seats-in-row", type=int, default=6)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        flight, users = self.create_flight(options)
+        seats = [
+            (row, seat)
+            for row in range(1, flight.airplane.rows + 1)
+            for seat in range(1, flight.airplane.seats_in_row + 1)
+        ]
+        results = []
+        results_lock = threading.Lock()
+
+        def book(user, orders_count, seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(orders_count):
+                    picked = rng.sample(seats, options["seats_per_order"])
+                    serializer = OrderSerializer(data={"tickets": [
+                        {"row": row, "seat": seat, "flight": flight.id}
+                        for row, seat in picked
+                    ]})
+                    started = time.perf_counter()
+                    try:
+                        serializer.is_valid(raise_exception=True)
+                        serializer.save(user=user)
+                        outcome = "created"
+                    except serializers.ValidationError:
+                        outcome = "conflict"
+                    except OperationalError:
+                        outcome = "error"
+                    elapsed = time.perf_counter() - started
+                    with results_lock:
+                        results.append((outcome, elapsed))
+            finally:
+                connection.close()
+
+        threads_count = options["threads"]
+        threads = [
+            threading.Thread(
+                target=book,
+                args=(
+                    users[index],
+                    options["orders"] // threads_count
+                    + (index < options["orders"] % threads_count),
+                    index,
+                ),
+            )
+            for index in range(threads_count)
+        ]
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall_time = time.perf_counter() - started
+
+            flight.refresh_from_db()
+            self.report(results, wall_time, flight, options)
+        finally:
+            self.cleanup(flight, users)
+
+    def create_flight(self, options):
+        suffix = timezone.now().strftime("%Y%m%d%H%M%S%f")
+        airplane = Airplane.objects.create(
+            name=f"Contention {suffix}",
+            rows=options["rows"],
+            seats_in_row=options["seats_in_row"],
+            airplane_type=AirplaneType.objects.create(
+                name=f"Contention {suffix}"
+            ),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name=f"Contention A {suffix}", closest_big_city="Alpha"
+            ),
+            destination=Airport.objects.create(
+                name=f"Contention B {suffix}", closest_big_city="Beta"
+            ),
+            distance=1000,
+        )
+        departure_time = timezone.now() + timedelta(days=30)
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+        users = [
+            get_user_model().objects.create_user(
+                email=f"contention{index}.{suffix}@example.com",
+                password=None,
+            )
+            for index in range(options["threads"])
+        ]
+        return flight, users
+
+    def cleanup(self, flight, users):
+        get_user_model().objects.filter(
+            pk__in=[user.pk for user in users]
+        ).delete()
+        flight.delete()
+        flight.route.delete()
+        Airport.objects.filter(
+            pk__in=[flight.route.source_id, flight.route.destination_id]
+        ).delete()
+        flight.airplane.delete()
+        flight.airplane.airplane_type.delete()
+
+    def report(self, results, wall_time, flight, options):
+        latencies = sorted(elapsed * 1000 for _, elapsed in results)
+        outcomes = [outcome for outcome, _ in results]
+        created = outcomes.count("created")
+        attempted = len(outcomes)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{connection.vendor}, "
+            f"lock strategy {settings.BOOKING_LOCK_STRATEGY}, "
+            f"{options['threads']} threads, "
+            f"{flight.airplane.rows * flight.airplane.seats_in_row} seats"
+        ))
+        self.stdout.write(
+            f"orders: {attempted}, created: {created}, "
+            f"conflicts: {outcomes.count('conflict')}, "
+            f"errors: {outcomes.count('error')}"
+        )
+        self.stdout.write(
+            f"conflict rate: "
+            f"{(attempted - created) / attempted if attempted else 0:.1%}"
+        )
+        self.stdout.write(
+            f"throughput: {attempted / wall_time:.1f} orders/s, "
+            f"{created / wall_time:.1f} successful orders/s"
+        )
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"latency: p50 {statistics.median(latencies):.1f} ms, "
+                f"p99 {percentiles[98]:.1f} ms"
+            )
+
+        expected = created * options["seats_per_order"]
+        if flight.seats_sold != expected:
+            self.stdout.write(self.style.ERROR(
+                f"seats_sold is {flight.seats_sold}, expected {expected}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("seats_sold is consistent"))
@@ -0,0 +1,489 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from airport.models import (
+    Airplane,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    OrderRequest,
+    Route,
+    Ticket,
+)
+from airport.urls import urlpatterns as airport_urlpatterns
+from airport.utils.exports import EXPORTS
+from user.urls import urlpatterns as user_urlpatterns
+
+Case = namedtuple(
+    "Case", ("name", "method", "path", "data", "user", "slow"),
+    defaults=(False,),
+)
+SLOW_REPEAT = 3
+
+COUNTED_MODELS = (
+    Airport, Route, Airplane, Crew, Flight, Order, Ticket, get_user_model()
+)
+
+
+class Command(BaseCommand):
+    """Django command to time every endpoint of the airport and user APIs
+    with the DRF test client on the current database. Results are written
+    as JSON and can be compared with the results of another commit. All
+    writes are rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="Results of an earlier run to compare with.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20,
+            help="Slowdown of the median in percent reported as regression.",
+        )
+        parser.add_argument(
+            "--only",
+            default="",
+            help="Time only endpoints whose name contains this text.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                "DEBUG is on, timings include debug toolbar overhead"
+            ))
+
+        results = {
+            "meta": self.describe_environment(),
+            "results": {},
+        }
+        # Throttling would reject repeated requests long before the end,
+        # the flight cache would serve every timed request from warm-up
+        with (
+            override_settings(
+                ALLOWED_HOSTS=["testserver"], FLIGHT_CACHE_TIMEOUT=0
+            ),
+            mock.patch.object(APIView, "check_throttles"),
+            transaction.atomic(),
+        ):
+            cases = self.build_cases()
+            self.report_untimed(cases)
+            for case in cases:
+                if options["only"] in case.name:
+                    results["results"][case.name] = self.measure(
+                        case, options["repeat"], options["warmup"]
+                    )
+            transaction.set_rollback(True)
+
+        with open(options["output"], "w") as output:
+            json.dump(results, output, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Results written to {options['output']}"
+        ))
+
+        if options["compare"]:
+            self.compare(options["compare"], results, options["threshold"])
+
+    def describe_environment(self):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "rows": {
+                model._meta.label: model.objects.count()
+                for model in COUNTED_MODELS
+            },
+        }
+
+    def build_cases(self):
+        now = timezone.now()
+        password = "benchmark1234"
+        staff = get_user_model().objects.create_superuser(
+            email=f"benchmark.{time.time_ns()}@example.com",
+            password=password,
+        )
+        order = Order.objects.order_by("-id").select_related("user").first()
+        user = order.user if order else staff
+        flight = (
+            Flight.objects
+            .filter(
+                departure_time__gt=now,
+                seats_sold__lt=(
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                ),
+            )
+            .select_related("airplane", "route__source", "route__destination")
+            .order_by("departure_time")
+            .first()
+        )
+        if flight is None:
+            raise CommandError(
+                "No upcoming flight with free seats, run generate_dataset."
+            )
+        order_request = (
+            OrderRequest.objects.order_by("-id").select_related("user").first()
+        )
+        token = self.client(None).post(
+            reverse("user:token_obtain_pair"),
+            {"email": staff.email, "password": password},
+        ).data
+
+        def airport(name, *args, **params):
+            return reverse(f"airport:{name}", args=args), params
+
+        trip = {
+            "from": flight.route.source.closest_big_city,
+            "to": flight.route.destination.closest_big_city,
+        }
+        free_seats = self.free_seats(flight)
+        cases = [
+            ("crews-list", "get", *airport("crew-list"), staff),
+            (
+                "crews-create",
+                "post",
+                *airport("crew-list", first_name="Jane", last_name="Doe"),
+                staff,
+            ),
+            (
+                "airplane-types-list",
+                "get",
+                *airport("airplanetype-list"),
+                user,
+            ),
+            ("airplanes-list", "get", *airport("airplane-list"), user),
+            (
+                "airplanes-detail",
+                "get",
+                *airport("airplane-detail", flight.airplane_id),
+                user,
+            ),
+            ("airports-list", "get", *airport("airport-list"), user),
+            (
+                "airports-detail",
+                "get",
+                *airport("airport-detail", flight.route.source_id),
+                user,
+            ),
+            (
+                "airports-autocomplete",
+                "get",
+                *airport(
+                    "airport-autocomplete",
+                    q=flight.route.source.closest_big_city[:3],
+                ),
+                user,
+            ),
+            ("routes-list", "get", *airport("route-list"), user),
+            (
+                "routes-list-cursor",
+                "get",
+                *airport("route-list", pagination="cursor"),
+                user,
+            ),
+            (
+                "routes-detail",
+                "get",
+                *airport("route-detail", flight.route_id),
+                user,
+            ),
+            (
+                "routes-paths",
+                "get",
+                *airport(
+                    "route-paths",
+                    source=flight.route.source_id,
+                    max_distance=5000,
+                    max_legs=2,
+                ),
+                user,
+            ),
+            ("flights-list", "get", *airport("flight-list"), user),
+            (
+                "flights-list-filtered",
+                "get",
+                *airport(
+                    "flight-list",
+                    departure_date=timezone.localdate(flight.departure_time),
+                    **trip,
+                ),
+                user,
+            ),
+            (
+                "flights-list-cursor",
+                "get",
+                *airport("flight-list", pagination="cursor"),
+                user,
+            ),
+            (
+                "flights-detail",
+                "get",
+                *airport("flight-detail", flight.id),
+                user,
+            ),
+            (
+                "flights-seatmap",
+                "get",
+                *airport("flight-seatmap", flight.id),
+                user,
+            ),
+            (
+                "flights-holds",
+                "get",
+                *airport("flight-holds", flight.id),
+                user,
+            ),
+            (
+                "flights-itineraries",
+                "get",
+                *airport(
+                    "flight-itineraries",
+                    date=timezone.localdate(flight.departure_time),
+                    **trip,
+                ),
+                user,
+            ),
+            (
+                "flights-calendar",
+                "get",
+                *airport(
+                    "flight-calendar",
+                    month=flight.departure_time.strftime("%Y-%m"),
+                    **trip,
+                ),
+                user,
+            ),
+            ("orders-list", "get", *airport("order-list"), user),
+            (
+                "orders-create",
+                "post",
+                reverse("airport:order-list"),
+                lambda: {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": flight.id}
+                        for row, seat in [next(free_seats)]
+                    ]
+                },
+                user,
+            ),
+            (
+                "order-requests-list",
+                "get",
+                *airport("orderrequest-list"),
+                order_request.user if order_request else user,
+            ),
+        ]
+        if order_request is not None:
+            cases.append((
+                "order-requests-detail",
+                "get",
+                *airport("orderrequest-detail", order_request.id),
+                order_request.user,
+            ))
+        cases.extend(
+            (
+                f"exports-{name}",
+                "get",
+                *airport("export-detail", name),
+                staff,
+                True,
+            )
+            for name in EXPORTS
+        )
+        cases.extend([
+            (
+                "user-register",
+                "post",
+                reverse("user:register"),
+                lambda: {
+                    "email": f"benchmark.{time.time_ns()}@example.com",
+                    "password": password,
+                    "first_name": "Bench",
+                    "last_name": "Mark",
+                },
+                None,
+            ),
+            (
+                "user-token",
+                "post",
+                reverse("user:token_obtain_pair"),
+                {"email": staff.email, "password": password},
+                None,
+            ),
+            (
+                "user-token-refresh",
+                "post",
+                reverse("user:token_refresh"),
+                {"refresh": token["refresh"]},
+                None,
+            ),
+            (
+                "user-token-verify",
+                "post",
+                reverse("user:token_verify"),
+                {"token": token["access"]},
+                None,
+            ),
+            ("user-me", "get", reverse("user:manage"), {}, user),
+            (
+                "user-me-update",
+                "patch",
+                reverse("user:manage"),
+                {"first_name": "Bench"},
+                user,
+            ),
+        ])
+        return [Case(*case) for case in cases]
+
+    def report_untimed(self, cases):
+        timed = {resolve(case.path).url_name for case in cases}
+        untimed = sorted({
+            pattern.name
+            for pattern in (*airport_urlpatterns, *user_urlpatterns)
+            if pattern.name and pattern.name != "api-root"
+        } - timed)
+        if untimed:
+            self.stdout.write(self.style.WARNING(
+                f"Not timed: {', '.join(untimed)}"
+            ))
+
+    @staticmethod
+    def free_seats(flight):
+        taken = set(
+            Ticket.objects
+            .filter(flight=flight)
+            .values_list("row", "seat")
+        )
+        return (
+            (row, seat)
+            for row in range(1, flight.airplane.rows + 1)
+            for seat in range(1, flight.airplane.seats_in_row + 1)
+            if (row, seat) not in taken
+        )
+
+    @staticmethod
+    def client(user):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client
+
+    def request(self, client, case):
+        data = case.data() if callable(case.data) else case.data
+        response = getattr(client, case.method)(case.path, data, format=(
+            None if case.method == "get" else "json"
+        ))
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        return response.status_code, size
+
+    def measure(self, case, repeat, warmup):
+        client = self.client(case.user)
+        if case.slow:
+            # Full table exports take seconds on a production-size dataset
+            repeat, warmup = min(repeat, SLOW_REPEAT), 0
+        for _ in range(warmup):
+            self.request(client, case)
+
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                status_code, size = self.request(client, case)
+                timings.append((time.perf_counter() - started) * 1000)
+
+        result = {
+            "method": case.method.upper(),
+            "path": case.path,
+            "status": status_code,
+            "bytes": size,
+            "queries": len(queries),
+            "repeat": repeat,
+            "min_ms": round(min(timings), 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(
+                statistics.quantiles(timings, n=20)[-1]
+                if len(timings) > 1 else timings[0],
+                3,
+            ),
+        }
+        style = self.style.ERROR if status_code >= 400 else str
+        self.stdout.write(style(
+            f"{case.name:<24} {result['median_ms']:>9.2f} ms median "
+            f"{result['p95_ms']:>9.2f} ms p95 {result['queries']:>4} queries"
+            f"  {status_code}"
+        ))
+        return result
+
+    def compare(self, path, results, threshold):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Compared with {baseline['meta'].get('commit') or path}"
+        ))
+        regressions = []
+        for name, result in results["results"].items():
+            before = baseline["results"].get(name)
+            if before is None:
+                self.stdout.write(f"{name:<24} new")
+                continue
+
+            change = (
+                (result["median_ms"] - before["median_ms"])
+                / before["median_ms"] * 100
+                if before["median_ms"] else 0
+            )
+            queries = result["queries"] - before["queries"]
+            line = (
+                f"{name:<24} {before['median_ms']:>9.2f} -> "
+                f"{result['median_ms']:>9.2f} ms {change:>+7.1f}% "
+                f"{queries:>+4} queries"
+            )
+            if change > threshold or queries > 0:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"Regressed: {', '.join(regressions)}")
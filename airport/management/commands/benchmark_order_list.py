@@ -0,0 +1,143 @@
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.serializers.order_serializers import OrderListSerializer
+from airport.utils.order_list import order_rows, serialize_orders
+
+
+class Command(BaseCommand):
+    """Django command to compare the order list serializer with the lean
+    column-based renderer for a frequent flyer. All data is rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1000)
+        parser.add_argument("--tickets-per-order", type=int, default=2)
+        parser.add_argument("--flights", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        with transaction.atomic():
+            user = self.create_history(options)
+
+            def serializer_list():
+                orders = Order.objects.filter(user=user).prefetch_related(
+                    "tickets__flight__route__source",
+                    "tickets__flight__route__destination",
+                    "tickets__flight__airplane"
+                )
+                return OrderListSerializer(orders, many=True).data
+
+            def lean_list():
+                return serialize_orders(list(order_rows(user)))
+
+            expected = serializer_list()
+            if lean_list() != expected:
+                self.stdout.write(self.style.ERROR(
+                    "Lean order list differs from OrderListSerializer"
+                ))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{options['orders']} orders, "
+                f"{options['orders'] * options['tickets_per_order']} tickets"
+            ))
+            for name, function in (
+                ("OrderListSerializer", serializer_list),
+                ("serialize_orders", lean_list),
+            ):
+                self.measure(name, function, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def create_history(self, options):
+        rng = random.Random(options["orders"])
+        user = get_user_model().objects.create_user(
+            email=f"flyer.{time.time_ns()}@example.com", password=None
+        )
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=60,
+            seats_in_row=10,
+            airplane_type=AirplaneType.objects.create(name="Benchmark"),
+        )
+        airports = Airport.objects.bulk_create([
+            Airport(name=f"Airport {index}", closest_big_city=f"City {index}")
+            for index in range(10)
+        ])
+        routes = Route.objects.bulk_create([
+            Route(source=source, destination=destination, distance=1000)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ])
+        departure_time = timezone.now() - timedelta(days=365)
+        flights = Flight.objects.bulk_create([
+            Flight(
+                route=rng.choice(routes),
+                airplane=airplane,
+                departure_time=departure_time + timedelta(days=index),
+                arrival_time=departure_time + timedelta(days=index, hours=2),
+            )
+            for index in range(options["flights"])
+        ])
+        orders = Order.objects.bulk_create([
+            Order(user=user) for _ in range(options["orders"])
+        ])
+
+        seats = [
+            (flight, row, seat)
+            for flight in flights
+            for row in range(1, airplane.rows + 1)
+            for seat in range(1, airplane.seats_in_row + 1)
+        ]
+        picked = iter(rng.sample(
+            seats, options["orders"] * options["tickets_per_order"]
+        ))
+        Ticket.objects.bulk_create(
+            [
+                Ticket(order=order, flight=flight, row=row, seat=seat)
+                for order in orders
+                for flight, row, seat in (
+                    next(picked)
+                    for _ in range(options["tickets_per_order"])
+                )
+            ],
+            batch_size=1000,
+        )
+        return user
+
+    def measure(self, name, function, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            function()
+
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+
+        self.stdout.write(
+            f"{name}: {elapsed:.1f} ms, {len(queries)} queries, "
+            f"peak memory {peak / 1024:.0f} KiB"
+        )
@@ -0,0 +1,137 @@
+import io
+import json
+import time
+import tracemalloc
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from airport.models import Flight, Order
+from airport.parsers import FastJSONParser
+from airport.renderers import FastJSONRenderer, orjson
+from airport.serializers.flight_serializers import (
+    FlightDetailSerializer,
+    FlightListSerializer,
+)
+from airport.serializers.order_serializers import OrderListSerializer
+
+
+class Command(BaseCommand):
+    """Django command to compare render and parse time and allocations
+    of the stdlib and orjson JSON renderers on flight and order payloads.
+    All data is rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=200)
+        parser.add_argument("--orders", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                "orjson is not installed, FastJSONRenderer uses the stdlib"
+            ))
+
+        with transaction.atomic():
+            call_command(
+                "generate_dataset",
+                airports=20,
+                flights=options["flights"],
+                users=20,
+                airplanes=5,
+                crew=50,
+                crew_per_flight=6,
+                stdout=StringIO(),
+            )
+            for name, serialize in self.payloads(options):
+                data = serialize()
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.measure(
+                    "serializer .data", serialize, min(options["repeat"], 5)
+                )
+                expected = json.loads(JSONRenderer().render(data))
+                for renderer in (JSONRenderer(), FastJSONRenderer()):
+                    content = renderer.render(data)
+                    if json.loads(content) != expected:
+                        self.stdout.write(self.style.ERROR(
+                            f"{type(renderer).__name__} output differs"
+                        ))
+                    self.measure(
+                        f"{type(renderer).__name__} ({len(content)} bytes)",
+                        lambda: renderer.render(data),
+                        options["repeat"],
+                    )
+                for parser in (JSONParser(), FastJSONParser()):
+                    self.measure(
+                        type(parser).__name__,
+                        lambda: parser.parse(io.BytesIO(content)),
+                        options["repeat"],
+                    )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def payloads(options):
+        flights = (
+            Flight.objects
+            .select_related("route__source", "route__destination", "airplane")
+            .annotate(
+                tickets_available=(
+                    F("airplane__rows") * F("airplane__seats_in_row")
+                    - F("seats_sold")
+                )
+            )
+            .order_by("departure_time")
+        )[:options["flights"]]
+        flight = (
+            Flight.objects
+            .select_related(
+                "airplane__airplane_type",
+                "route__source",
+                "route__destination",
+            )
+            .prefetch_related("crew", "tickets")
+            .order_by("-seats_sold")
+            .first()
+        )
+        orders = Order.objects.prefetch_related(
+            "tickets__flight__route__source",
+            "tickets__flight__route__destination",
+            "tickets__flight__airplane",
+        )[:options["orders"]]
+
+        return (
+            (
+                f"FlightListSerializer, {len(flights)} flights",
+                lambda: FlightListSerializer(flights, many=True).data,
+            ),
+            (
+                f"FlightDetailSerializer, {flight.seats_sold} taken seats",
+                lambda: FlightDetailSerializer(flight).data,
+            ),
+            (
+                f"OrderListSerializer, {len(orders)} orders",
+                lambda: OrderListSerializer(orders, many=True).data,
+            ),
+        )
+
+    def measure(self, name, function, repeat):
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+
+        self.stdout.write(
+            f"{name}: {elapsed:.2f} ms, peak memory {peak / 1024:.0f} KiB"
+        )
@@ -0,0 +1,269 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.utils.flight_cache import flight_cache
+
+SYLLABLES = (
+    "ber", "lin", "lon", "don", "par", "is", "ma", "drid", "ro", "me",
+    "kyi", "iv", "os", "lo", "vie", "nna", "pra", "gue", "war", "saw",
+    "ath", "ens", "du", "bai", "to", "kyo", "li", "ma", "san", "tos",
+)
+AIRPLANE_TYPES = ("Airbus A320", "Boeing 737", "Embraer E190", "Boeing 787")
+CREW_POSITIONS = [position for position, _ in Crew.CrewPosition.choices]
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with a synthetic
+    production-scale dataset. Data is appended, every run uses new
+    names, so it can be repeated to grow the dataset."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=500)
+        parser.add_argument("--routes-per-airport", type=int, default=8)
+        parser.add_argument("--flights", type=int, default=20_000)
+        parser.add_argument(
+            "--fill-rate",
+            type=float,
+            default=0.7,
+            help="Average share of sold seats of a flight, from 0 to 1.",
+        )
+        parser.add_argument("--users", type=int, default=5_000)
+        parser.add_argument("--airplanes", type=int, default=100)
+        parser.add_argument("--crew", type=int, default=2_000)
+        parser.add_argument("--crew-per-flight", type=int, default=4)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=180,
+            help="Flights depart between 30 days ago and this many days "
+            "from now.",
+        )
+        parser.add_argument(
+            "--password",
+            default="dataset1234",
+            help="Password of every generated user.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if not 0 <= options["fill_rate"] <= 1:
+            raise CommandError("--fill-rate must be between 0 and 1.")
+        if options["airports"] < 2:
+            raise CommandError("--airports must be at least 2.")
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        self.rng = random.Random(options["seed"])
+        self.tag = format(time.time_ns() // 1_000_000, "x")
+        self.batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            airports = self.create_airports(options["airports"])
+            routes = self.create_routes(
+                airports, options["routes_per_airport"]
+            )
+            airplanes = self.create_airplanes(options["airplanes"])
+            crew = self.create_crew(options["crew"])
+            user_ids = self.create_users(
+                options["users"], options["password"]
+            )
+
+        tickets = 0
+        flights_left = options["flights"]
+        while flights_left > 0:
+            count = min(flights_left, max(self.batch_size // 25, 1))
+            with transaction.atomic():
+                tickets += self.create_flights(
+                    count, routes, airplanes, crew, user_ids, options
+                )
+            flights_left -= count
+            self.stdout.write(
+                f"{options['flights'] - flights_left} flights, "
+                f"{tickets} tickets"
+            )
+
+        flight_cache.invalidate(catalog=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(airports)} airports, {len(routes)} routes, "
+            f"{options['flights']} flights, {tickets} tickets and "
+            f"{len(user_ids)} users (user.<n>.{self.tag}@example.com, "
+            f"password {options['password']!r}) "
+            f"in {time.perf_counter() - started:.1f} s"
+        ))
+
+    def word(self):
+        return "".join(
+            self.rng.choice(SYLLABLES)
+            for _ in range(self.rng.randint(2, 3))
+        ).capitalize()
+
+    def create_airports(self, count):
+        cities = [self.word() for _ in range(max(count // 3, 1))]
+        return Airport.objects.bulk_create(
+            [
+                Airport(
+                    name=f"{self.word()} {self.tag}-{index}",
+                    closest_big_city=self.rng.choice(cities),
+                )
+                for index in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_routes(self, airports, per_airport):
+        per_airport = min(per_airport, len(airports) - 1)
+        routes = []
+        for source in airports:
+            destinations = [
+                destination
+                for destination in self.rng.sample(airports, per_airport + 1)
+                if destination != source
+            ]
+            routes.extend(
+                Route(
+                    source=source,
+                    destination=destination,
+                    distance=self.rng.randint(200, 9000),
+                )
+                for destination in destinations[:per_airport]
+            )
+        return Route.objects.bulk_create(routes, batch_size=self.batch_size)
+
+    def create_airplanes(self, count):
+        airplane_types = AirplaneType.objects.bulk_create([
+            AirplaneType(name=f"{name} {self.tag}")
+            for name in AIRPLANE_TYPES
+        ])
+        return Airplane.objects.bulk_create(
+            [
+                Airplane(
+                    name=f"{self.word()} {self.tag}-{index}",
+                    rows=self.rng.randint(20, 60),
+                    seats_in_row=self.rng.choice((4, 6, 6, 8, 10)),
+                    airplane_type=self.rng.choice(airplane_types),
+                )
+                for index in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_crew(self, count):
+        return Crew.objects.bulk_create(
+            [
+                Crew(
+                    first_name=self.word(),
+                    last_name=self.word(),
+                    position=self.rng.choice(CREW_POSITIONS),
+                )
+                for _ in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_users(self, count, password):
+        password = make_password(password)
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(
+                    email=f"user.{index}.{self.tag}@example.com",
+                    password=password,
+                    first_name=self.word(),
+                    last_name=self.word(),
+                )
+                for index in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+        return [user.id for user in users]
+
+    def create_flights(
+        self, count, routes, airplanes, crew, user_ids, options
+    ):
+        """Create flights with crew and orders, return number of tickets"""
+        now = timezone.now()
+        flights = []
+        for _ in range(count):
+            airplane = self.rng.choice(airplanes)
+            departure_time = now + timedelta(
+                minutes=self.rng.randint(-30 * 24 * 60, options["days"] * 1440)
+            )
+            fill_rate = min(
+                max(options["fill_rate"] + self.rng.uniform(-0.1, 0.1), 0), 1
+            )
+            flights.append(Flight(
+                route=self.rng.choice(routes),
+                airplane=airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(
+                    minutes=self.rng.randint(45, 15 * 60)
+                ),
+                seats_sold=round(airplane.capacity * fill_rate),
+            ))
+        flights = Flight.objects.bulk_create(flights)
+
+        if crew:
+            Flight.crew.through.objects.bulk_create(
+                [
+                    Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+                    for flight in flights
+                    for member in self.rng.sample(
+                        crew, min(options["crew_per_flight"], len(crew))
+                    )
+                ],
+                batch_size=self.batch_size,
+            )
+
+        # Each order books 1 to 4 neighbouring sold seats of one flight
+        seats_by_order = []
+        for flight in flights:
+            seats = sorted(self.rng.sample(
+                range(flight.airplane.capacity), flight.seats_sold
+            ))
+            while seats:
+                size = self.rng.randint(1, 4)
+                seats_by_order.append(
+                    (flight.id, flight.airplane.seats_in_row, seats[:size])
+                )
+                del seats[:size]
+
+        orders = Order.objects.bulk_create(
+            [
+                Order(user_id=self.rng.choice(user_ids))
+                for _ in seats_by_order
+            ],
+            batch_size=self.batch_size,
+        )
+        tickets = [
+            Ticket(
+                order_id=order.id,
+                flight_id=flight_id,
+                row=seat // seats_in_row + 1,
+                seat=seat % seats_in_row + 1,
+            )
+            for order, (flight_id, seats_in_row, seats) in zip(
+                orders, seats_by_order
+            )
+            for seat in seats
+        ]
+        Ticket.objects.bulk_create(tickets, batch_size=self.batch_size)
+        return len(tickets)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.utils.seed_data import load_seed_data
+
+
+class Command(BaseCommand):
+    """Django command to bulk load JSON fixtures, skipping fixtures whose
+    content is already loaded"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixtures", nargs="+")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load fixtures even when their content is already loaded.",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        for path in options["fixtures"]:
+            started = time.perf_counter()
+            try:
+                count = load_seed_data(
+                    path, options["batch_size"], options["force"]
+                )
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot load {path}: {error}")
+
+            if count is None:
+                self.stdout.write(f"{path} is already loaded, skipped")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Loaded {count} object(s) from {path} in "
+                    f"{time.perf_counter() - started:.2f} s"
+                ))
@@ -0,0 +1,91 @@
+import logging
+import os
+import socket
+import threading
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from airport.models import OrderRequest
+from airport.order_queue import claim_order_requests, process_order_requests
+
+logger = logging.getLogger("airport.order_queue")
+
+
+class Command(BaseCommand):
+    """Django command to book queued orders with a pool of worker threads,
+    in batches of orders for the same flights"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling it",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        stop = threading.Event()
+        if options["workers"] == 1:
+            self.work(f"{socket.gethostname()}:{os.getpid()}", stop, **options)
+            return
+
+        threads = [
+            threading.Thread(
+                target=self.work_in_thread,
+                args=(f"{socket.gethostname()}:{os.getpid()}:{index}",),
+                kwargs={"stop": stop, **options},
+            )
+            for index in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def work_in_thread(self, *args, **kwargs):
+        try:
+            self.work(*args, **kwargs)
+        finally:
+            connection.close()
+
+    def work(self, worker, stop, batch_size, poll_interval, once, **options):
+        while not stop.is_set():
+            try:
+                order_requests = claim_order_requests(worker, batch_size)
+                if order_requests:
+                    process_order_requests(order_requests)
+            except Exception:
+                # Claimed requests are picked up again after the timeout
+                logger.exception("%s: processing the queue failed", worker)
+                if once:
+                    raise
+                connection.close_if_unusable_or_obsolete()
+                stop.wait(poll_interval)
+                continue
+
+            if not order_requests:
+                if once:
+                    return
+                stop.wait(poll_interval)
+                continue
+
+            statuses = Counter(
+                order_request.status for order_request in order_requests
+            )
+            self.stdout.write(
+                f"{worker}: "
+                f"{statuses[OrderRequest.Status.COMPLETED]} order(s) booked, "
+                f"{statuses[OrderRequest.Status.REJECTED]} rejected, "
+                f"{statuses[OrderRequest.Status.PROCESSING]} taken over "
+                "by other workers"
+            )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import IdempotencyKey
+from airport.utils.idempotency import idempotency_expiry
+
+
+class Command(BaseCommand):
+    """Django command to delete expired idempotency keys in bulk"""
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_at__lte=idempotency_expiry()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} expired idempotency key(s) deleted")
+        )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from airport.models import Flight, Ticket
+
+
+class Command(BaseCommand):
+    """Django command to detect and repair drift of Flight.seats_sold"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted flights without updating them",
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        sold = (
+            Ticket.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+
+        with transaction.atomic():
+            drifted = list(
+                Flight.objects
+                .select_for_update()
+                .annotate(actual=Coalesce(Subquery(sold), Value(0)))
+                .exclude(seats_sold=Coalesce(Subquery(sold), Value(0)))
+                .values_list("id", "seats_sold", "actual")
+            )
+
+            for flight_id, seats_sold, actual in drifted:
+                self.stdout.write(
+                    f"Flight #{flight_id}: seats_sold={seats_sold}, "
+                    f"tickets={actual}"
+                )
+                if not options["dry_run"]:
+                    Flight.objects.filter(pk=flight_id).update(
+                        seats_sold=actual
+                    )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("No drift detected"))
+        elif options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"{len(drifted)} flight(s) drifted")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(drifted)} flight(s) repaired")
+            )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.models import SeatHold
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds in bulk"""
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        deleted, _ = SeatHold.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"{deleted} expired seat hold(s) deleted")
+        )
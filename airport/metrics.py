@@ -0,0 +1,253 @@
+import bisect
+import hmac
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+
+from airport.utils.flight_cache import flight_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield f"{name}_bucket", {**labels, "le": str(bound)}, cumulative
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, self.count
+
+
+class QueryTimer:
+    """connection.execute_wrapper counting queries and time spent in SQL"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def format_sample(name, labels, value):
+    if labels:
+        pairs = ",".join(
+            f'{key}="{escape(label)}"' for key, label in labels.items()
+        )
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value}"
+
+
+class Metrics:
+    """Per-process request metrics keyed by view name and action
+
+    Labels come from resolved URL names, never from raw paths, so the
+    number of series stays bounded by the URL configuration.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = defaultdict(int)
+            self._latency = {}
+            self._queries = {}
+            self._sql_seconds = defaultdict(float)
+            self._overhead = Histogram(LATENCY_BUCKETS)
+
+    def observe(self, labels, status, seconds, timer):
+        key = tuple(labels.items())
+        with self._lock:
+            self._requests[(*key, ("status", status))] += 1
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._queries[key] = Histogram(QUERY_BUCKETS)
+            self._latency[key].observe(seconds)
+            self._queries[key].observe(timer.count)
+            self._sql_seconds[key] += timer.seconds
+
+    def observe_overhead(self, seconds):
+        with self._lock:
+            self._overhead.observe(seconds)
+
+    def render(self):
+        with self._lock:
+            families = (
+                (
+                    "airport_http_requests_total",
+                    "counter",
+                    "Requests by view, action, method and status.",
+                    [
+                        ("airport_http_requests_total", dict(key), value)
+                        for key, value in self._requests.items()
+                    ],
+                ),
+                (
+                    "airport_http_request_duration_seconds",
+                    "histogram",
+                    "Time until the view returned a response.",
+                    [
+                        sample
+                        for key, histogram in self._latency.items()
+                        for sample in histogram.samples(
+                            "airport_http_request_duration_seconds",
+                            dict(key),
+                        )
+                    ],
+                ),
+                (
+                    "airport_db_queries_per_request",
+                    "histogram",
+                    "SQL queries run by a request.",
+                    [
+                        sample
+                        for key, histogram in self._queries.items()
+                        for sample in histogram.samples(
+                            "airport_db_queries_per_request", dict(key)
+                        )
+                    ],
+                ),
+                (
+                    "airport_db_query_duration_seconds_total",
+                    "counter",
+                    "Time spent in SQL queries.",
+                    [
+                        (
+                            "airport_db_query_duration_seconds_total",
+                            dict(key),
+                            round(value, 6),
+                        )
+                        for key, value in self._sql_seconds.items()
+                    ],
+                ),
+                (
+                    "airport_metrics_overhead_seconds",
+                    "histogram",
+                    "Time the metrics middleware adds to a request.",
+                    list(self._overhead.samples(
+                        "airport_metrics_overhead_seconds", {}
+                    )),
+                ),
+            )
+
+        lines = []
+        for name, kind, description, samples in families:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(format_sample(*sample) for sample in samples)
+
+        if flight_cache.enabled:
+            for name, value in flight_cache.stats().items():
+                if name != "hit_ratio":
+                    metric = f"airport_flight_cache_{name}_total"
+                    lines.append(f"# TYPE {metric} counter")
+                    lines.append(format_sample(metric, {}, value))
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def view_labels(request):
+    """Resolved URL name and viewset action, None for the metrics view"""
+    match = request.resolver_match
+    if match is None:
+        return {"view": "unmatched", "action": "", "method": request.method}
+    if getattr(match.func, "metrics_exempt", False):
+        return None
+    actions = getattr(match.func, "actions", None) or {}
+    return {
+        "view": match.view_name or match._func_path,
+        "action": actions.get(request.method.lower(), ""),
+        "method": request.method,
+    }
+
+
+class MetricsMiddleware:
+    """Records latency and SQL metrics of every request
+
+    Should be first in MIDDLEWARE, so the latency covers all others.
+    Disabled by METRICS_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        finished = time.perf_counter()
+
+        labels = view_labels(request)
+        if labels is not None:
+            metrics.observe(
+                labels, response.status_code, finished - started, timer
+            )
+            metrics.observe_overhead(time.perf_counter() - finished)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process' metrics
+
+    Requires "Authorization: Bearer <METRICS_TOKEN>". Without a token it
+    is only served in DEBUG to INTERNAL_IPS, like the debug toolbar.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        if not (
+            settings.DEBUG
+            and request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+        ):
+            return HttpResponse(status=403)
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type=CONTENT_TYPE)
+
+
+metrics_view.metrics_exempt = True
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:05
+
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    ("airport_name_trgm", "name", "gin", "gin_trgm_ops"),
+    ("airport_city_trgm", "closest_big_city", "gin", "gin_trgm_ops"),
+    ("airport_name_prefix", "name", "btree", "text_pattern_ops"),
+    ("airport_city_prefix", "closest_big_city", "btree", "text_pattern_ops"),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column, method, opclass in SEARCH_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON airport_airport "
+            f"USING {method} ((UPPER({column}::text)) {opclass})"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, *_ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0005_flight_seats_sold'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
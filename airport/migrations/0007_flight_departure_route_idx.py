@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0006_airport_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['departure_time', 'route'], name='flight_departure_route_idx'),
+        ),
+    ]
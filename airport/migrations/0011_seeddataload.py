@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0010_orderrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeedDataLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fixture', models.CharField(max_length=255)),
+                ('checksum', models.CharField(max_length=64, unique=True)),
+                ('objects_count', models.PositiveIntegerField()),
+                ('loaded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
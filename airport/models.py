@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 
 
 class Crew(models.Model):
@@ -102,6 +104,24 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "route"],
+                name="flight_departure_route_idx"
+            )
+        ]
+
+    @staticmethod
+    def change_seats_sold(seats_by_flight):
+        """Apply {flight_id: delta} to the denormalized seat counters"""
+        for flight_id, delta in seats_by_flight.items():
+            if flight_id is not None and delta:
+                Flight.objects.filter(pk=flight_id).update(
+                    seats_sold=Greatest(F("seats_sold") + delta, Value(0))
+                )
 
     def __str__(self) -> str:
         return f"{self.route} - {self.airplane.name}"
@@ -178,9 +198,124 @@ class Ticket(models.Model):
         update_fields=None,
     ):
         self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
-        )
+        with transaction.atomic(using=using):
+            return super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
 
     def __str__(self) -> str:
         return f"{self.flight} (row: {self.row}, seat: {self.seat})"
+
+
+class SeatHold(models.Model):
+    row = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flight", "row", "seat"],
+                name="unique_hold_flight_row_seat"
+            )
+        ]
+        ordering = ["row", "seat"]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.flight_id} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+
+class OrderRequest(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PROCESSING = "processing", "Processing"
+        COMPLETED = "completed", "Completed"
+        REJECTED = "rejected", "Rejected"
+
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="order_requests"
+    )
+    tickets = models.JSONField()
+    status = models.CharField(
+        max_length=15,
+        choices=Status,
+        default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="request"
+    )
+    errors = models.JSONField(null=True)
+    claimed_by = models.CharField(max_length=63, blank=True)
+    claimed_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "id"],
+                name="order_request_status_idx"
+            )
+        ]
+        ordering = ["-created_at"]
+
+    @property
+    def flight_ids(self):
+        return sorted({ticket["flight"] for ticket in self.tickets})
+
+    def __str__(self) -> str:
+        return f"Order request #{self.id}: {self.status}"
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True)
+    headers = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"],
+                name="unique_idempotency_user_key"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key} of user {self.user_id}"
+
+
+class SeedDataLoad(models.Model):
+    fixture = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=64, unique=True)
+    objects_count = models.PositiveIntegerField()
+    loaded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.fixture} ({self.checksum[:12]})"
@@ -0,0 +1,114 @@
+import logging
+import random
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework import serializers
+
+from airport.metrics import view_labels
+from airport.utils.sql import normalize_sql
+
+logger = logging.getLogger("airport.n_plus_one")
+
+PROJECT_DIR = str(settings.BASE_DIR)
+IGNORED_DIRS = ("site-packages", "dist-packages", __file__)
+
+
+def serializer_field(frame):
+    """Innermost serializer field being rendered by a call stack"""
+    while frame is not None:
+        if frame.f_code.co_name == "to_representation":
+            serializer = frame.f_locals.get("self")
+            field = frame.f_locals.get("field")
+            if isinstance(serializer, serializers.Serializer) and field:
+                return f"{type(serializer).__name__}.{field.field_name}"
+        frame = frame.f_back
+    return None
+
+
+def code_location(frame):
+    """Innermost frame of project code in a call stack"""
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(PROJECT_DIR) and not any(
+            ignored in path for ignored in IGNORED_DIRS
+        ):
+            return (
+                f"{path[len(PROJECT_DIR) + 1:]}:{frame.f_lineno} "
+                f"in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return None
+
+
+class RepeatedQueries:
+    """execute_wrapper grouping the queries of a request by template
+
+    The stack is inspected once per template, when it repeats for the
+    threshold time, so a request with no repeats only pays for the
+    normalization of its queries.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.sources = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        template = normalize_sql(sql)
+        self.counts[template] += 1
+        if self.counts[template] == self.threshold:
+            frame = sys._getframe(1)
+            self.sources[template] = (
+                serializer_field(frame), code_location(frame)
+            )
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        return [
+            (template, count, *self.sources[template])
+            for template, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    """Logs structurally identical queries repeated within a request
+
+    Runs on N_PLUS_ONE_SAMPLE_RATE of requests (0 to 1), a template is
+    reported when it runs N_PLUS_ONE_THRESHOLD times or more, with the
+    serializer field and the code that triggered it.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, "N_PLUS_ONE_SAMPLE_RATE", 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.threshold = getattr(settings, "N_PLUS_ONE_THRESHOLD", 5)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        queries = RepeatedQueries(self.threshold)
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+
+        labels = view_labels(request)
+        for template, count, field, location in queries.repeated():
+            logger.warning(
+                "%s queries with the same template in %s %s (%s), "
+                "triggered by %s at %s: %s",
+                count,
+                request.method,
+                request.path,
+                labels["view"] if labels else "metrics",
+                field or "no serializer field",
+                location or "unknown location",
+                template[:500],
+            )
+        return response
@@ -0,0 +1,269 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from airport.booking import (
+    HELD_SEAT_MESSAGE,
+    UNIQUE_SEAT_MESSAGE,
+    active_holds,
+    lock_flights,
+    retry_lock_conflicts,
+    seat_range_error,
+)
+from airport.models import Flight, Order, OrderRequest, SeatHold, Ticket
+from airport.utils.flight_cache import flight_cache
+
+logger = logging.getLogger("airport.order_queue")
+
+MISSING_FLIGHT_MESSAGE = 'Invalid pk "{}" - object does not exist.'
+FAILED_MESSAGE = "The order could not be processed, please try again."
+
+
+def prefers_async(request):
+    """Whether an order should be queued instead of booked right away"""
+    preferences = {
+        preference.strip().lower()
+        for preference in request.headers.get("Prefer", "").split(",")
+    }
+    return "respond-async" in preferences or getattr(
+        settings, "ORDER_INTAKE_ASYNC", False
+    )
+
+
+def claim_order_requests(worker, limit):
+    """Mark up to limit queued requests as processed by a worker
+
+    Requests of a worker that stopped without finishing them are claimed
+    again after ORDER_QUEUE_CLAIM_TIMEOUT seconds. A worker books requests
+    only while it still holds their claim, checked under a row lock in the
+    booking transaction, so a request taken over from a slow worker is
+    booked by one of them only.
+    """
+    now = timezone.now()
+    stale = now - timedelta(
+        seconds=getattr(settings, "ORDER_QUEUE_CLAIM_TIMEOUT", 300)
+    )
+    claimable = OrderRequest.objects.filter(
+        Q(status=OrderRequest.Status.PENDING)
+        | Q(status=OrderRequest.Status.PROCESSING, claimed_at__lt=stale)
+    )
+
+    with transaction.atomic():
+        candidates = claimable.order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list("id", flat=True)[:limit])
+        claimable.filter(id__in=ids).update(
+            status=OrderRequest.Status.PROCESSING,
+            claimed_by=worker,
+            claimed_at=now,
+        )
+
+    return list(
+        OrderRequest.objects
+        .filter(
+            status=OrderRequest.Status.PROCESSING,
+            claimed_by=worker,
+            claimed_at=now,
+        )
+        .order_by("id")
+    )
+
+
+def owned_order_requests(order_requests):
+    """Lock requests and keep those still claimed as they were loaded
+
+    Must be called inside a transaction. Requests another worker claimed
+    again or finished in the meantime are left to it.
+    """
+    claims = {
+        order_request_id: (claimed_by, claimed_at)
+        for order_request_id, claimed_by, claimed_at in (
+            OrderRequest.objects
+            .select_for_update()
+            .filter(
+                id__in=[order_request.id for order_request in order_requests],
+                status=OrderRequest.Status.PROCESSING,
+            )
+            .values_list("id", "claimed_by", "claimed_at")
+        )
+    }
+    return [
+        order_request
+        for order_request in order_requests
+        if claims.get(order_request.id) == (
+            order_request.claimed_by, order_request.claimed_at
+        )
+    ]
+
+
+def ticket_errors(order_request, flights, taken, holds):
+    errors = []
+    for ticket in order_request.tickets:
+        seat = (ticket["flight"], ticket["row"], ticket["seat"])
+        flight = flights.get(ticket["flight"])
+        if flight is None:
+            error = {"flight": [MISSING_FLIGHT_MESSAGE.format(seat[0])]}
+        else:
+            error = seat_range_error(
+                ticket["row"], ticket["seat"], flight.airplane
+            )
+        if not error and seat in taken:
+            error = {"non_field_errors": [UNIQUE_SEAT_MESSAGE]}
+        elif not error and holds.get(seat, order_request.user_id) != (
+            order_request.user_id
+        ):
+            error = {"non_field_errors": [HELD_SEAT_MESSAGE]}
+        errors.append(error)
+    return errors
+
+
+def book_order_requests(order_requests):
+    """Book queued requests sharing flights with one lock and bulk INSERTs
+
+    Must be called inside a transaction. Requests are served in queue
+    order, so the earliest one gets a contested seat and later ones are
+    rejected with the same errors as POST /orders/.
+    """
+    order_requests = owned_order_requests(order_requests)
+    if not order_requests:
+        return []
+
+    flights = Flight.objects.select_related("airplane").in_bulk({
+        flight_id
+        for order_request in order_requests
+        for flight_id in order_request.flight_ids
+    })
+    lock_flights(flights)
+
+    seats = [
+        (ticket["flight"], ticket["row"], ticket["seat"])
+        for order_request in order_requests
+        for ticket in order_request.tickets
+    ]
+    taken = set(
+        Ticket.objects
+        .filter(
+            flight_id__in={flight_id for flight_id, _, _ in seats},
+            row__in={row for _, row, _ in seats},
+            seat__in={seat for _, _, seat in seats},
+        )
+        .values_list("flight_id", "row", "seat")
+    )
+    holds = active_holds(seats)
+
+    accepted = []
+    processed_at = timezone.now()
+    for order_request in order_requests:
+        # Reset what a rolled back attempt left on the instance
+        order_request.status = OrderRequest.Status.PROCESSING
+        order_request.order = None
+        order_request.errors = None
+        order_request.processed_at = processed_at
+        errors = ticket_errors(order_request, flights, taken, holds)
+        if any(errors):
+            order_request.status = OrderRequest.Status.REJECTED
+            order_request.errors = {"tickets": errors}
+            continue
+        taken.update(
+            (ticket["flight"], ticket["row"], ticket["seat"])
+            for ticket in order_request.tickets
+        )
+        accepted.append(order_request)
+
+    orders = Order.objects.bulk_create([
+        Order(user_id=order_request.user_id) for order_request in accepted
+    ])
+    tickets = Ticket.objects.bulk_create([
+        Ticket(
+            order=order,
+            flight=flights[ticket["flight"]],
+            row=ticket["row"],
+            seat=ticket["seat"],
+        )
+        for order_request, order in zip(accepted, orders)
+        for ticket in order_request.tickets
+    ])
+    for order_request, order in zip(accepted, orders):
+        order_request.order = order
+        order_request.status = OrderRequest.Status.COMPLETED
+
+    if tickets:
+        Flight.change_seats_sold(
+            Counter(ticket.flight_id for ticket in tickets)
+        )
+        SeatHold.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(
+                        flight_id=ticket.flight_id,
+                        row=ticket.row,
+                        seat=ticket.seat,
+                        user_id=ticket.order.user_id,
+                    )
+                    for ticket in tickets
+                ),
+            )
+        ).delete()
+        flight_cache.invalidate(
+            route_ids={ticket.flight.route_id for ticket in tickets}
+        )
+
+    OrderRequest.objects.bulk_update(
+        order_requests, ["status", "order", "errors", "processed_at"]
+    )
+    return orders
+
+
+@transaction.atomic
+def reject_order_requests(order_requests, errors):
+    order_requests = owned_order_requests(order_requests)
+    processed_at = timezone.now()
+    for order_request in order_requests:
+        order_request.status = OrderRequest.Status.REJECTED
+        order_request.order = None
+        order_request.errors = errors
+        order_request.processed_at = processed_at
+    OrderRequest.objects.bulk_update(
+        order_requests, ["status", "order", "errors", "processed_at"]
+    )
+
+
+def book_batch(batch):
+    """Book a batch, falling back to one request at a time if it fails
+
+    A request that still fails on its own is rejected, so it is not
+    claimed again and does not fail every batch it lands in.
+    """
+    try:
+        retry_lock_conflicts(book_order_requests, batch)
+    except Exception:
+        logger.exception(
+            "Booking order requests %s failed",
+            [order_request.id for order_request in batch],
+        )
+        if len(batch) > 1:
+            for order_request in batch:
+                book_batch([order_request])
+        else:
+            reject_order_requests(
+                batch, {"non_field_errors": [FAILED_MESSAGE]}
+            )
+
+
+def process_order_requests(order_requests):
+    """Book claimed requests in batches of requests for the same flights"""
+    batches = defaultdict(list)
+    for order_request in order_requests:
+        batches[tuple(order_request.flight_ids)].append(order_request)
+
+    for batch in batches.values():
+        book_batch(batch)
@@ -1,7 +1,49 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class OrderPagination(PageNumberPagination):
     page_size = 2
     page_size_query_param = "page_size"
     max_page_size = 10
+
+
+class FlightCursorPagination(CursorPagination):
+    ordering = ("departure_time", "id")
+
+
+class RouteCursorPagination(CursorPagination):
+    ordering = ("id",)
+
+
+class OrderCursorPagination(CursorPagination):
+    page_size = 2
+    page_size_query_param = "page_size"
+    max_page_size = 10
+    ordering = ("-created_at", "-id")
+
+
+class CursorPaginationMixin:
+    """Switch a viewset to keyset pagination on request
+
+    Clients opt in with ?pagination=cursor, following pages keep it through
+    the cursor parameter of next/previous links. Other requests keep using
+    pagination_class.
+    """
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        request = getattr(self, "request", None)
+        if self.cursor_pagination_class is None or request is None:
+            return False
+
+        query_params = request.query_params
+        return (
+            query_params.get("pagination") == "cursor"
+            or self.cursor_pagination_class.cursor_query_param in query_params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self.use_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super(CursorPaginationMixin, self).paginator
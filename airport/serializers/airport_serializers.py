@@ -8,3 +8,11 @@ class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
         fields = ("id", "name", "closest_big_city")
+
+
+class AirportAutocompleteSerializer(AirportSerializer):
+    routes = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Airport
+        fields = ("id", "name", "closest_big_city", "routes")
@@ -71,6 +71,37 @@ class FlightDetailSerializer(FlightSerializer):
         fields = FlightSerializer.Meta.fields + ("taken_tickets", )
 
 
+class FlightSeatMapSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(read_only=True)
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    seats_taken = serializers.IntegerField(read_only=True)
+    seats_outside_layout = serializers.IntegerField(read_only=True)
+    encoding = serializers.CharField(read_only=True)
+    seats = serializers.JSONField(read_only=True)
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(source="id", read_only=True)
+    route = serializers.CharField(read_only=True)
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    duration = serializers.DurationField(read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+    legs = ItineraryLegSerializer(many=True, read_only=True)
+
+
+class FlightCalendarDaySerializer(serializers.Serializer):
+    date = serializers.DateField(read_only=True)
+    flights = serializers.IntegerField(read_only=True)
+    min_seats_available = serializers.IntegerField(read_only=True)
+
+
 class FlightOrderSerializer(serializers.ModelSerializer):
     route = serializers.StringRelatedField(read_only=True)
     airplane_name = serializers.CharField(
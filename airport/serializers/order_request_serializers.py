@@ -0,0 +1,47 @@
+from rest_framework import serializers
+
+from airport.booking import duplicate_errors
+from airport.models import OrderRequest
+
+
+class OrderRequestTicketSerializer(serializers.Serializer):
+    row = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+    flight = serializers.IntegerField(min_value=1)
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    """Queued order, validated for shape only until a worker books it"""
+
+    tickets = OrderRequestTicketSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = OrderRequest
+        fields = (
+            "id",
+            "status",
+            "tickets",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+        read_only_fields = (
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
+
+    def validate_tickets(self, tickets):
+        errors = duplicate_errors([
+            (ticket["flight"], ticket["row"], ticket["seat"])
+            for ticket in tickets
+        ])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return [dict(ticket) for ticket in tickets]
+
+    def create(self, validated_data):
+        return OrderRequest.objects.create(**validated_data)
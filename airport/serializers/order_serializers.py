@@ -1,7 +1,7 @@
-from django.db import transaction
 from rest_framework import serializers
 
-from airport.models import Order, Ticket
+from airport.booking import create_order
+from airport.models import Order
 from airport.serializers.ticket_serializers import (
     TicketSerializer,
     TicketListSerializer
@@ -16,13 +16,18 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "created_at", "tickets")
 
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        tickets_data = validated_data.pop("tickets")
+        return create_order(tickets_data, **validated_data)
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class OrderCancelSerializer(serializers.Serializer):
+    tickets = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        help_text="Ids of tickets to cancel, the whole order by default",
+    )
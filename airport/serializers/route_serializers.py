@@ -28,3 +28,15 @@ class RouteListSerializer(RouteSerializer):
 class RouteDetailSerializer(RouteSerializer):
     source = AirportSerializer(read_only=True)
     destination = AirportSerializer(read_only=True)
+
+
+class RoutePathSerializer(serializers.Serializer):
+    distance = serializers.IntegerField()
+    airports = AirportSerializer(many=True)
+    routes = serializers.ListField(child=serializers.IntegerField())
+
+
+class RouteReachableSerializer(serializers.Serializer):
+    airport = AirportSerializer()
+    distance = serializers.IntegerField()
+    legs = serializers.IntegerField()
@@ -0,0 +1,21 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from airport.models import SeatHold
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = SeatHold
+        fields = ("row", "seat", "expires_at")
+        read_only_fields = ("expires_at",)
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    seats = SeatHoldSerializer(many=True, allow_empty=False)
+    minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+        default=settings.SEAT_HOLD_MINUTES,
+    )
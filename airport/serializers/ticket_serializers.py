@@ -2,11 +2,86 @@ from django.core.exceptions import ValidationError
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from airport.models import Ticket
+from airport.booking import (
+    duplicate_seat_errors,
+    held_seat_errors,
+    taken_seat_errors,
+)
+from airport.models import Flight, Ticket
 from airport.serializers.flight_serializers import FlightOrderSerializer
 
 
+def parse_pk(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TicketFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolves flights from the batch preloaded by the list serializer"""
+
+    flights_by_pk = None
+
+    def to_internal_value(self, data):
+        if self.flights_by_pk is not None:
+            flight = self.flights_by_pk.get(parse_pk(data))
+            if flight is not None:
+                return flight
+        return super(TicketFlightField, self).to_internal_value(data)
+
+
+class TicketBulkSerializer(serializers.ListSerializer):
+    """Validates a whole list of tickets with a fixed number of queries"""
+
+    def to_internal_value(self, data):
+        flight_field = self.child.fields["flight"]
+        if isinstance(data, list):
+            flight_ids = {
+                parse_pk(item.get("flight"))
+                for item in data
+                if isinstance(item, dict)
+            }
+            flight_field.flights_by_pk = (
+                Flight.objects
+                .select_related("airplane")
+                .in_bulk(flight_ids - {None})
+            )
+
+        try:
+            tickets_data = super(
+                TicketBulkSerializer, self
+            ).to_internal_value(data)
+        finally:
+            flight_field.flights_by_pk = None
+
+        checks = [
+            duplicate_seat_errors(tickets_data),
+            taken_seat_errors(tickets_data),
+        ]
+        request = self.context.get("request")
+        if request is not None and request.user.is_authenticated:
+            checks.append(held_seat_errors(tickets_data, request.user))
+
+        errors = [
+            next((error for error in item_errors if error), {})
+            for item_errors in zip(*checks)
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return tickets_data
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = TicketFlightField(queryset=Flight.objects.all())
+
+    def get_validators(self):
+        if isinstance(self.parent, TicketBulkSerializer):
+            return []
+        return super(TicketSerializer, self).get_validators()
 
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -27,6 +102,7 @@ class TicketSerializer(serializers.ModelSerializer):
                 fields=("row", "seat", "flight")
             )
         ]
+        list_serializer_class = TicketBulkSerializer
 
 
 class TicketListSerializer(TicketSerializer):
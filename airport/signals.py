@@ -0,0 +1,153 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from airport.models import Airplane, Airport, Crew, Flight, Route, Ticket
+from airport.utils.airport_index import airport_index
+from airport.utils.flight_cache import flight_cache
+from airport.utils.itineraries import flight_graph
+from airport.utils.route_graph import route_graph
+
+
+def ticket_route_id(ticket):
+    if Ticket.flight.is_cached(ticket):
+        return ticket.flight.route_id
+    return (
+        Flight.objects
+        .filter(pk=ticket.flight_id)
+        .values_list("route_id", flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, raw, **kwargs):
+    instance._previous_flight_id = None
+    if not raw and instance.pk and not instance._state.adding:
+        instance._previous_flight_id = (
+            Ticket.objects
+            .filter(pk=instance.pk)
+            .values_list("flight_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    previous_flight_id = getattr(instance, "_previous_flight_id", None)
+    if created:
+        Flight.change_seats_sold({instance.flight_id: 1})
+    elif previous_flight_id not in (None, instance.flight_id):
+        Flight.change_seats_sold(
+            {previous_flight_id: -1, instance.flight_id: 1}
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def count_deleted_ticket(sender, instance, **kwargs):
+    Flight.change_seats_sold({instance.flight_id: -1})
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_graph(sender, instance, **kwargs):
+    flight_graph.refresh_flight(instance.id)
+
+
+@receiver(post_delete, sender=Flight)
+def remove_from_flight_graph(sender, instance, **kwargs):
+    flight_graph.remove_flight(instance.id)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def invalidate_flight_graph(sender, **kwargs):
+    flight_graph.invalidate()
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_route(sender, instance, **kwargs):
+    flight_cache.invalidate(route_ids=[ticket_route_id(instance)])
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def invalidate_flight(sender, instance, **kwargs):
+    flight_cache.forget_flight(instance.id)
+    flight_cache.invalidate(route_ids=[instance.route_id], catalog=True)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(m2m_changed, sender=Flight.crew.through)
+def invalidate_flight_catalog(sender, **kwargs):
+    flight_cache.invalidate(catalog=True)
+
+
+@receiver(post_save, sender=Airport)
+def refresh_airport_index(sender, instance, **kwargs):
+    airport_index.refresh_airport(instance.id)
+
+
+@receiver(post_delete, sender=Airport)
+def remove_from_airport_index(sender, instance, **kwargs):
+    airport_index.remove_airport(instance.id)
+
+
+@receiver(pre_save, sender=Route)
+def remember_route_airports(sender, instance, raw, **kwargs):
+    instance._previous_airport_ids = ()
+    if not raw and instance.pk and not instance._state.adding:
+        instance._previous_airport_ids = (
+            Route.objects
+            .filter(pk=instance.pk)
+            .values_list("source_id", "destination_id")
+            .first()
+        ) or ()
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def count_airport_routes(sender, instance, **kwargs):
+    airport_index.refresh_route_counts([
+        instance.source_id,
+        instance.destination_id,
+        *getattr(instance, "_previous_airport_ids", ()),
+    ])
+
+
+@receiver(post_save, sender=Route)
+def refresh_route_graph(sender, instance, **kwargs):
+    route_graph.refresh_route(
+        instance.id, getattr(instance, "_previous_airport_ids", ())
+    )
+
+
+@receiver(post_delete, sender=Route)
+def remove_from_route_graph(sender, instance, **kwargs):
+    route_graph.remove_route(instance.source_id, instance.destination_id)
+
+
+@receiver(post_save, sender=Airport)
+def refresh_route_graph_airport(sender, instance, **kwargs):
+    route_graph.refresh_airport(instance.id)
+
+
+@receiver(post_delete, sender=Airport)
+def remove_from_route_graph_airport(sender, instance, **kwargs):
+    route_graph.remove_airport(instance.id)
@@ -0,0 +1,137 @@
+import difflib
+from unittest import mock
+
+from django.db import connection
+from django.db.backends.utils import CursorWrapper
+
+from airport.utils.sql import normalize_sql
+
+
+class QueryRecorder:
+    """Records SQL and number of fetched rows of every query in a block
+
+    Rows are counted by wrapping fetch methods of Django's CursorWrapper,
+    which every backend cursor goes through.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._queries_by_cursor = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        query = {"sql": sql, "params": params, "rows": 0}
+        self.queries.append(query)
+        self._queries_by_cursor[id(context["cursor"])] = query
+        return execute(sql, params, many, context)
+
+    def _count(self, cursor, rows):
+        query = self._queries_by_cursor.get(id(cursor))
+        if query is not None:
+            query["rows"] += rows
+
+    def __enter__(self):
+        recorder = self
+
+        def fetchone(cursor):
+            row = cursor.cursor.fetchone()
+            recorder._count(cursor, row is not None)
+            return row
+
+        def fetchmany(cursor, *args, **kwargs):
+            rows = cursor.cursor.fetchmany(*args, **kwargs)
+            recorder._count(cursor, len(rows))
+            return rows
+
+        def fetchall(cursor):
+            rows = cursor.cursor.fetchall()
+            recorder._count(cursor, len(rows))
+            return rows
+
+        self._patches = [
+            mock.patch.object(CursorWrapper, name, method, create=True)
+            for name, method in (
+                ("fetchone", fetchone),
+                ("fetchmany", fetchmany),
+                ("fetchall", fetchall),
+            )
+        ]
+        for patch in self._patches:
+            patch.start()
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+        for patch in self._patches:
+            patch.stop()
+
+    @property
+    def rows(self):
+        return sum(query["rows"] for query in self.queries)
+
+    def statements(self):
+        return [normalize_sql(query["sql"]) for query in self.queries]
+
+    def report(self):
+        return "\n".join(
+            f"{index}. [{query['rows']} rows] {query['sql']}"
+            for index, query in enumerate(self.queries, start=1)
+        )
+
+
+class QueryBudgetMixin:
+    """Pin query and row budgets of an endpoint at growing dataset sizes
+
+    grow(size) must bring the dataset to size objects. The request is
+    repeated for every size, its number of queries must stay within
+    max_queries and be the same for all sizes, fetched rows must stay
+    within max_rows. Failures list the SQL, or a diff of statements
+    between the smallest and the largest dataset.
+    """
+
+    dataset_sizes = (1, 4, 12)
+
+    def assertQueryBudget(
+        self, request, grow, max_queries, max_rows, expected_status=200
+    ):
+        recorded = []
+        for size in self.dataset_sizes:
+            grow(size)
+            with QueryRecorder() as recorder:
+                response = request()
+            self.assertEqual(
+                response.status_code,
+                expected_status,
+                getattr(response, "data", None),
+            )
+            recorded.append((size, recorder))
+
+            self.assertLessEqual(
+                len(recorder.queries),
+                max_queries,
+                f"{len(recorder.queries)} queries with {size} objects, "
+                f"budget is {max_queries}:\n{recorder.report()}",
+            )
+            self.assertLessEqual(
+                recorder.rows,
+                max_rows,
+                f"{recorder.rows} rows fetched with {size} objects, "
+                f"budget is {max_rows}:\n{recorder.report()}",
+            )
+
+        first_size, first = recorded[0]
+        for size, recorder in recorded[1:]:
+            if len(recorder.queries) != len(first.queries):
+                diff = "\n".join(difflib.unified_diff(
+                    first.statements(),
+                    recorder.statements(),
+                    fromfile=f"{first_size} objects",
+                    tofile=f"{size} objects",
+                    lineterm="",
+                ))
+                self.fail(
+                    f"Queries grow with the dataset, from "
+                    f"{len(first.queries)} to {len(recorder.queries)}:\n"
+                    f"{diff}"
+                )
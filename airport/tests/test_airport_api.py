@@ -3,8 +3,9 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from airport.models import Airport
+from airport.models import Airport, Route
 from airport.serializers.airport_serializers import AirportSerializer
+from airport.utils.airport_index import airport_index
 from airport.utils.samples import (
     sample_user,
     sample_superuser,
@@ -12,6 +13,7 @@ from airport.utils.samples import (
 )
 
 AIRPORT_URL = reverse("airport:airport-list")
+AUTOCOMPLETE_URL = reverse("airport:airport-autocomplete")
 
 
 def detail_url(airport_id):
@@ -91,3 +93,69 @@ class AdminAirportApiTests(TestCase):
         res = self.client.delete(detail_url(self.airport.id))
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class AirportAutocompleteApiTests(TestCase):
+
+    def setUp(self):
+        airport_index.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.heathrow = sample_airport(
+            name="Heathrow Airport", closest_big_city="London"
+        )
+        self.gatwick = sample_airport(
+            name="Gatwick Airport", closest_big_city="London"
+        )
+        self.paris = sample_airport(
+            name="Charles de Gaulle", closest_big_city="Paris"
+        )
+        Route.objects.create(
+            source=self.gatwick, destination=self.paris, distance=300
+        )
+
+    def autocomplete(self, query, **params):
+        return self.client.get(AUTOCOMPLETE_URL, {"q": query, **params})
+
+    def test_autocomplete_ranks_by_route_count(self):
+        response = self.autocomplete("lon")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["id"] for airport in response.data],
+            [self.gatwick.id, self.heathrow.id]
+        )
+        self.assertEqual(response.data[0]["routes"], 1)
+
+    def test_autocomplete_matches_any_word_case_insensitive(self):
+        response = self.autocomplete("  GAUL")
+
+        self.assertEqual(
+            [airport["id"] for airport in response.data], [self.paris.id]
+        )
+
+    def test_autocomplete_index_follows_changes(self):
+        self.autocomplete("lon")
+        Route.objects.create(
+            source=self.heathrow, destination=self.paris, distance=300
+        )
+        Route.objects.create(
+            source=self.paris, destination=self.heathrow, distance=300
+        )
+        self.gatwick.closest_big_city = "Crawley"
+        self.gatwick.save()
+        sample_airport(name="London City", closest_big_city="London")
+
+        with self.assertNumQueries(0):
+            response = self.autocomplete("lon", limit=5)
+
+        self.assertEqual(
+            [airport["name"] for airport in response.data],
+            ["Heathrow Airport", "London City"]
+        )
+        self.assertEqual(response.data[0]["routes"], 2)
+
+    def test_autocomplete_requires_query(self):
+        response = self.autocomplete(" ")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,391 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from airport.models import (
+    Crew,
+    Flight,
+    IdempotencyKey,
+    Order,
+    OrderRequest,
+    Route,
+    SeedDataLoad,
+    SeatHold,
+    Ticket,
+)
+from airport.order_queue import (
+    FAILED_MESSAGE,
+    book_order_requests,
+    claim_order_requests,
+    process_order_requests,
+)
+from airport.utils.samples import (
+    sample_flight,
+    sample_order,
+    sample_ticket,
+    sample_user,
+)
+
+
+class ReconcileSeatsSoldCommandTests(TestCase):
+
+    def setUp(self):
+        self.flight = sample_flight()
+        sample_ticket(flight=self.flight)
+        Flight.objects.filter(pk=self.flight.pk).update(seats_sold=7)
+
+    def test_dry_run_reports_drift_without_fixing(self):
+        out = StringIO()
+        call_command("reconcile_seats_sold", "--dry-run", stdout=out)
+        self.flight.refresh_from_db()
+
+        self.assertIn(f"Flight #{self.flight.id}", out.getvalue())
+        self.assertEqual(self.flight.seats_sold, 7)
+
+    def test_reconcile_repairs_drift(self):
+        call_command("reconcile_seats_sold", stdout=StringIO())
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 1)
+
+
+class SweepSeatHoldsCommandTests(TestCase):
+
+    def test_sweep_deletes_only_expired_holds(self):
+        flight = sample_flight()
+        user = sample_user()
+        now = timezone.now()
+        for seat, expires_at in (
+            (1, now - datetime.timedelta(minutes=1)),
+            (2, now + datetime.timedelta(minutes=1)),
+        ):
+            SeatHold.objects.create(
+                flight=flight, row=1, seat=seat, user=user,
+                expires_at=expires_at
+            )
+
+        call_command("sweep_seat_holds", stdout=StringIO())
+
+        self.assertEqual(
+            list(SeatHold.objects.values_list("seat", flat=True)), [2]
+        )
+
+
+class PurgeIdempotencyKeysCommandTests(TestCase):
+
+    def test_purge_deletes_only_expired_keys(self):
+        user = sample_user()
+        for key, hours in (("old", 25), ("fresh", 1)):
+            record = IdempotencyKey.objects.create(
+                user=user, key=key, request_hash="hash"
+            )
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                created_at=timezone.now() - datetime.timedelta(hours=hours)
+            )
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["fresh"]
+        )
+
+
+class ProcessOrderQueueCommandTests(TestCase):
+
+    def setUp(self):
+        self.flight = sample_flight()
+        self.user = sample_user()
+        self.other_user = sample_user(email="other@test.com")
+
+    def queue(self, user, *seats):
+        return OrderRequest.objects.create(
+            user=user,
+            tickets=[
+                {"row": 1, "seat": seat, "flight": self.flight.id}
+                for seat in seats
+            ],
+        )
+
+    def test_worker_books_queued_orders_first_come_first_served(self):
+        first = self.queue(self.user, 1, 2)
+        second = self.queue(self.other_user, 2, 3)
+        third = self.queue(self.other_user, 3)
+        SeatHold.objects.create(
+            flight=self.flight, row=1, seat=1, user=self.user,
+            expires_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+
+        call_command("process_order_queue", "--once", stdout=StringIO())
+        for order_request in (first, second, third):
+            order_request.refresh_from_db()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(first.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(first.order.tickets.count(), 2)
+        self.assertEqual(second.status, OrderRequest.Status.REJECTED)
+        self.assertEqual(
+            second.errors,
+            {
+                "tickets": [
+                    {
+                        "non_field_errors": [
+                            "The fields row, seat, flight must make "
+                            "a unique set."
+                        ]
+                    },
+                    {},
+                ]
+            }
+        )
+        self.assertEqual(third.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(self.flight.seats_sold, 3)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_worker_rejects_seats_sold_after_queueing(self):
+        sample_ticket(
+            flight=self.flight,
+            order=sample_order(user=self.other_user),
+            row=1,
+            seat=1
+        )
+        order_request = self.queue(self.user, 1)
+
+        call_command("process_order_queue", "--once", stdout=StringIO())
+        order_request.refresh_from_db()
+
+        self.assertEqual(order_request.status, OrderRequest.Status.REJECTED)
+        self.assertIsNone(order_request.order)
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 1)
+
+    def test_retried_booking_resets_previous_attempt(self):
+        self.queue(self.user, 1)
+        [order_request] = claim_order_requests("worker", 10)
+        order_request.status = OrderRequest.Status.REJECTED
+        order_request.errors = {"tickets": [{"row": ["stale"]}]}
+
+        with transaction.atomic():
+            book_order_requests([order_request])
+        order_request.refresh_from_db()
+
+        self.assertEqual(order_request.status, OrderRequest.Status.COMPLETED)
+        self.assertIsNone(order_request.errors)
+        self.assertIsNotNone(order_request.order)
+
+    def test_request_taken_over_by_other_worker_not_booked(self):
+        self.queue(self.user, 1)
+        [order_request] = claim_order_requests("slow", 10)
+        order = sample_order(user=self.user)
+        OrderRequest.objects.filter(pk=order_request.pk).update(
+            status=OrderRequest.Status.COMPLETED,
+            claimed_by="other",
+            order=order,
+        )
+
+        process_order_requests([order_request])
+        order_request.refresh_from_db()
+
+        self.assertEqual(order_request.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(order_request.order, order)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_failing_request_rejected_without_stopping_worker(self):
+        booked = self.queue(self.user, 1)
+        broken = OrderRequest.objects.create(
+            user=self.other_user,
+            tickets=[{"row": 1, "flight": self.flight.id}],
+        )
+
+        with self.assertLogs("airport.order_queue", "ERROR"):
+            call_command(
+                "process_order_queue", "--once", stdout=StringIO()
+            )
+        booked.refresh_from_db()
+        broken.refresh_from_db()
+
+        self.assertEqual(booked.status, OrderRequest.Status.COMPLETED)
+        self.assertEqual(broken.status, OrderRequest.Status.REJECTED)
+        self.assertIsNone(broken.order)
+        self.assertEqual(
+            broken.errors, {"non_field_errors": [FAILED_MESSAGE]}
+        )
+
+
+class GenerateDatasetCommandTests(TestCase):
+
+    def test_generates_flights_filled_with_tickets(self):
+        call_command(
+            "generate_dataset",
+            "--airports=6",
+            "--routes-per-airport=2",
+            "--flights=5",
+            "--fill-rate=0.5",
+            "--users=3",
+            "--airplanes=2",
+            "--crew=4",
+            "--crew-per-flight=2",
+            stdout=StringIO(),
+        )
+        flights = Flight.objects.annotate(tickets_count=Count("tickets"))
+
+        self.assertEqual(Route.objects.count(), 12)
+        self.assertEqual(flights.count(), 5)
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertEqual(Flight.crew.through.objects.count(), 10)
+        self.assertFalse(
+            flights.exclude(tickets_count=F("seats_sold")).exists()
+        )
+        for flight in flights.select_related("airplane"):
+            self.assertAlmostEqual(
+                flight.seats_sold / flight.airplane.capacity, 0.5, delta=0.11
+            )
+        self.assertFalse(
+            Order.objects.annotate(tickets_count=Count("tickets"))
+            .filter(tickets_count=0)
+            .exists()
+        )
+
+    def test_fill_rate_out_of_range(self):
+        with self.assertRaises(CommandError):
+            call_command("generate_dataset", "--fill-rate=2")
+
+
+class BenchmarkEndpointsCommandTests(TestCase):
+
+    def setUp(self):
+        call_command(
+            "generate_dataset",
+            "--airports=4",
+            "--routes-per-airport=2",
+            "--flights=4",
+            "--users=2",
+            "--airplanes=1",
+            "--crew=2",
+            "--days=10",
+            stdout=StringIO(),
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, "benchmark.json")
+
+    def benchmark(self, *args):
+        call_command(
+            "benchmark_endpoints",
+            "--repeat=1",
+            "--warmup=0",
+            f"--output={self.output}",
+            *args,
+            stdout=StringIO(),
+        )
+        with open(self.output) as output:
+            return json.load(output)
+
+    def test_times_endpoints_and_rolls_back(self):
+        orders_count = Order.objects.count()
+        users_count = get_user_model().objects.count()
+
+        results = self.benchmark()
+
+        self.assertEqual(results["meta"]["rows"]["airport.Flight"], 4)
+        self.assertEqual(results["results"]["flights-list"]["status"], 200)
+        self.assertEqual(results["results"]["orders-create"]["status"], 201)
+        self.assertEqual(
+            results["results"]["exports-tickets"]["method"], "GET"
+        )
+        self.assertTrue(all(
+            result["status"] < 400 for result in results["results"].values()
+        ))
+        self.assertEqual(Order.objects.count(), orders_count)
+        self.assertEqual(get_user_model().objects.count(), users_count)
+
+    @override_settings(FLIGHT_CACHE_TIMEOUT=300)
+    def test_flight_requests_not_served_from_cache(self):
+        results = self.benchmark("--only=flights-", "--warmup=2")
+
+        for name in ("flights-list", "flights-detail", "flights-calendar"):
+            self.assertGreater(results["results"][name]["queries"], 0, name)
+
+    def test_compare_reports_more_queries_as_regression(self):
+        baseline = self.benchmark("--only=orders-list")
+        baseline["results"]["orders-list"]["queries"] -= 1
+        baseline_path = f"{self.output}.baseline"
+        with open(baseline_path, "w") as baseline_file:
+            json.dump(baseline, baseline_file)
+
+        with self.assertRaisesMessage(CommandError, "orders-list"):
+            self.benchmark(
+                "--only=orders-list",
+                f"--compare={baseline_path}",
+                "--threshold=1000000",
+            )
+
+
+class LoadSeedDataCommandTests(TestCase):
+    fixture = "airport_service_db_data.json"
+
+    def load(self, *args):
+        out = StringIO()
+        call_command("load_seed_data", *args, stdout=out)
+        return out.getvalue()
+
+    def test_loads_fixture_with_relations_and_sequences(self):
+        self.load(self.fixture)
+        flight = Flight.objects.get(pk=1)
+
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(
+            sorted(flight.crew.values_list("id", flat=True)), [1, 2]
+        )
+        self.assertEqual(flight.seats_sold, 1)
+        self.assertEqual(
+            Crew.objects.create(first_name="New", last_name="Crew").id, 3
+        )
+
+    def test_skips_loaded_content_unless_forced(self):
+        self.load(self.fixture)
+        Crew.objects.filter(pk=1).update(first_name="Changed")
+
+        output = self.load(self.fixture)
+        self.assertIn("already loaded", output)
+        self.assertEqual(Crew.objects.get(pk=1).first_name, "Changed")
+
+        self.load(self.fixture, "--force")
+        self.assertEqual(Crew.objects.get(pk=1).first_name, "John")
+        self.assertEqual(SeedDataLoad.objects.count(), 1)
+
+    def test_changed_content_is_loaded_over_existing_rows(self):
+        self.load(self.fixture)
+        with open(self.fixture) as fixture:
+            data = json.load(fixture)
+        data[2]["fields"]["first_name"] = "Jack"
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "seed.json")
+        with open(path, "w") as fixture:
+            json.dump(data, fixture)
+
+        self.load(path)
+
+        self.assertEqual(Crew.objects.get(pk=1).first_name, "Jack")
+        self.assertEqual(Crew.objects.count(), 2)
+        self.assertEqual(SeedDataLoad.objects.count(), 2)
+
+    def test_malformed_fixture(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "seed.json")
+        with open(path, "w") as fixture:
+            fixture.write('[{"model": "airport.crew"')
+
+        with self.assertRaises(CommandError):
+            self.load(path)
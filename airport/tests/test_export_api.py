@@ -0,0 +1,128 @@
+import csv
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.utils.samples import (
+    sample_flight,
+    sample_order,
+    sample_superuser,
+    sample_ticket,
+    sample_user,
+)
+
+
+def export_url(name):
+    return reverse("airport:export-detail", args=[name])
+
+
+def read_content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class NotStaffExportApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_staff_required(self):
+        response = self.client.get(export_url("orders"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StaffExportApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_superuser())
+
+    def test_export_flights_as_csv(self):
+        flight = sample_flight()
+
+        response = self.client.get(export_url("flights"))
+        rows = list(csv.reader(read_content(response).splitlines()))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="flights.csv"', response["Content-Disposition"])
+        self.assertEqual(
+            rows[0],
+            [
+                "id",
+                "source",
+                "destination",
+                "departure_time",
+                "arrival_time",
+                "airplane",
+                "seats_sold",
+            ]
+        )
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], str(flight.id))
+
+    def test_export_tickets_as_ndjson_filtered_by_order_date(self):
+        user = sample_user()
+        flight = sample_flight()
+        old_order = sample_order(user=user)
+        Order.objects.filter(pk=old_order.pk).update(
+            created_at="2024-01-01T12:00:00Z"
+        )
+        sample_ticket(flight=flight, order=old_order, row=1, seat=1)
+        ticket = sample_ticket(
+            flight=flight, order=sample_order(user=user), row=1, seat=2
+        )
+
+        response = self.client.get(
+            export_url("tickets"),
+            {"output": "ndjson", "created_from": "2024-02-01"}
+        )
+        lines = [
+            json.loads(line)
+            for line in read_content(response).splitlines()
+        ]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["id"], ticket.id)
+        self.assertEqual(lines[0]["user"], user.email)
+        self.assertEqual(lines[0]["seat"], 2)
+
+    def test_export_orders_until_date_includes_whole_day(self):
+        user = sample_user()
+        orders = [sample_order(user=user) for _ in range(3)]
+        for order, created_at in zip(orders, (
+            "2024-01-01T12:00:00Z",
+            "2024-01-02T12:00:00Z",
+            "2024-01-03T12:00:00Z",
+        )):
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+
+        response = self.client.get(
+            export_url("orders"),
+            {"output": "ndjson", "created_to": "2024-01-02"}
+        )
+        ids = [
+            json.loads(line)["id"]
+            for line in read_content(response).splitlines()
+        ]
+
+        self.assertEqual(ids, [orders[0].id, orders[1].id])
+
+    def test_export_with_out_of_range_date(self):
+        response = self.client.get(
+            export_url("orders"), {"created_to": "9999-12-31"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_with_invalid_output(self):
+        response = self.client.get(export_url("orders"), {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_unknown_table(self):
+        response = self.client.get("/api/airport/exports/users/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
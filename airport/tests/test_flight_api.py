@@ -1,13 +1,17 @@
+import base64
 import datetime
 from operator import itemgetter
 
 from django.db.models import F, Count
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from airport.models import Flight
+from airport.models import Airplane, Flight, Order, SeatHold, Ticket
+from airport.utils.flight_cache import flight_cache
+from airport.utils.itineraries import flight_graph
 from airport.serializers.flight_serializers import (
     FlightListSerializer,
     FlightDetailSerializer
@@ -16,16 +20,27 @@ from airport.utils.samples import (
     sample_user,
     sample_superuser,
     sample_flight,
-    sample_airport, sample_route, sample_airplane, sample_crew
+    sample_airport, sample_route, sample_airplane, sample_crew,
+    sample_ticket, sample_order
 )
 
 FLIGHT_URL = reverse("airport:flight-list")
+ITINERARIES_URL = reverse("airport:flight-itineraries")
+CALENDAR_URL = reverse("airport:flight-calendar")
 
 
 def detail_url(flight_id):
     return reverse("airport:flight-detail", args=[flight_id])
 
 
+def seatmap_url(flight_id):
+    return reverse("airport:flight-seatmap", args=[flight_id])
+
+
+def holds_url(flight_id):
+    return reverse("airport:flight-holds", args=[flight_id])
+
+
 class UnauthenticatedFlightApiTests(TestCase):
 
     def setUp(self):
@@ -42,6 +57,7 @@ class AuthenticatedFlightTypeApiTests(TestCase):
         self.client = APIClient()
         self.user = sample_user()
         self.client.force_authenticate(self.user)
+        self.order = sample_order(user=self.user)
         self.flight = sample_flight()
         self.other_flight = sample_flight(
             route=sample_route(
@@ -129,6 +145,75 @@ class AuthenticatedFlightTypeApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_seatmap_base64(self):
+        sample_ticket(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+        sample_ticket(
+            flight=self.flight, order=self.order, row=2, seat=10
+        )
+
+        response = self.client.get(seatmap_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("seats_taken"), 2)
+        self.assertEqual(
+            base64.b64decode(response.data.get("seats")),
+            bytes([0b10000000, 0b00000000, 0b00010000])
+        )
+        self.assertIn("ETag", response.headers)
+
+    def test_seatmap_rle(self):
+        sample_ticket(
+            flight=self.flight, order=self.order, row=1, seat=3
+        )
+
+        response = self.client.get(
+            seatmap_url(self.flight.id), {"encoding": "rle"}
+        )
+
+        self.assertEqual(response.data.get("seats"), [[2, 1, 7], [10]])
+
+    def test_seatmap_after_airplane_shrunk(self):
+        sample_ticket(flight=self.flight, order=self.order, row=1, seat=2)
+        sample_ticket(flight=self.flight, order=self.order, row=1, seat=10)
+        sample_ticket(flight=self.flight, order=self.order, row=2, seat=1)
+        Airplane.objects.filter(pk=self.flight.airplane_id).update(
+            rows=1, seats_in_row=5
+        )
+
+        response = self.client.get(
+            seatmap_url(self.flight.id), {"encoding": "rle"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seats"], [[1, 1, 3]])
+        self.assertEqual(response.data["seats_taken"], 1)
+        self.assertEqual(response.data["seats_outside_layout"], 2)
+
+    def test_seatmap_not_modified(self):
+        etag = self.client.get(seatmap_url(self.flight.id)).headers["ETag"]
+
+        response = self.client.get(
+            seatmap_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+        with self.assertNumQueries(2):
+            self.client.get(
+                seatmap_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+            )
+
+        sample_ticket(flight=self.flight, order=self.order)
+        response = self.client.get(
+            seatmap_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_create_flight_forbidden(self):
         response = self.client.post(FLIGHT_URL, {})
 
@@ -148,6 +233,468 @@ class AuthenticatedFlightTypeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class FlightItinerariesApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        flight_graph.invalidate()
+
+        self.date = timezone.localdate() + datetime.timedelta(days=10)
+        rome = sample_airport(name="Fiumicino", closest_big_city="Rome")
+        vienna = sample_airport(name="Schwechat", closest_big_city="Vienna")
+        paris = sample_airport(name="Orly", closest_big_city="Paris")
+
+        vienna_paris = sample_route(source=vienna, destination=paris)
+
+        self.direct = self.sample_leg(
+            sample_route(source=rome, destination=paris), 8, 18
+        )
+        self.first_leg = self.sample_leg(
+            sample_route(source=rome, destination=vienna), 9, 11
+        )
+        self.second_leg = self.sample_leg(vienna_paris, 12, 14)
+        self.sample_leg(vienna_paris, 11, 13)
+
+    def sample_leg(self, route, departure_hour, arrival_hour):
+        return sample_flight(
+            route=route,
+            departure_time=timezone.make_aware(
+                datetime.datetime.combine(
+                    self.date, datetime.time(departure_hour)
+                )
+            ),
+            arrival_time=timezone.make_aware(
+                datetime.datetime.combine(
+                    self.date, datetime.time(arrival_hour)
+                )
+            )
+        )
+
+    def test_itineraries_sorted_by_duration(self):
+        response = self.client.get(
+            ITINERARIES_URL,
+            {"from": "rome", "to": "paris", "date": self.date.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [leg["flight"] for leg in itinerary["legs"]]
+                for itinerary in response.data
+            ],
+            [[self.first_leg.id, self.second_leg.id], [self.direct.id]]
+        )
+        self.assertEqual(response.data[0]["duration"], "05:00:00")
+        self.assertEqual(response.data[0]["seats_available"], 20)
+
+    def test_itineraries_direct_only(self):
+        response = self.client.get(
+            ITINERARIES_URL,
+            {
+                "from": "Rome",
+                "to": "Paris",
+                "date": self.date.isoformat(),
+                "max_legs": 1
+            }
+        )
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["legs"][0]["flight"], self.direct.id)
+
+    def test_itineraries_skip_sold_out_flights(self):
+        Flight.objects.filter(id=self.second_leg.id).update(seats_sold=20)
+
+        response = self.client.get(
+            ITINERARIES_URL,
+            {"from": "Rome", "to": "Paris", "date": self.date.isoformat()}
+        )
+
+        self.assertEqual(len(response.data), 1)
+
+    def test_itineraries_limit_counts_only_flights_with_seats(self):
+        Flight.objects.filter(id=self.second_leg.id).update(seats_sold=20)
+
+        response = self.client.get(
+            ITINERARIES_URL,
+            {
+                "from": "Rome",
+                "to": "Paris",
+                "date": self.date.isoformat(),
+                "limit": 1,
+            }
+        )
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["legs"][0]["flight"], self.direct.id)
+
+    def test_itineraries_max_layover_less_than_min_layover(self):
+        response = self.client.get(
+            ITINERARIES_URL,
+            {
+                "from": "Rome",
+                "to": "Paris",
+                "date": self.date.isoformat(),
+                "min_layover": 60,
+                "max_layover": 30,
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("max_layover", response.data)
+
+    def test_itineraries_out_of_range_date(self):
+        for date in ("9999-12-31", "0001-01-01"):
+            response = self.client.get(
+                ITINERARIES_URL, {"from": "Rome", "to": "Paris", "date": date}
+            )
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_itineraries_require_parameters(self):
+        response = self.client.get(ITINERARIES_URL, {"from": "Rome"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("to", response.data)
+        self.assertIn("date", response.data)
+
+
+@override_settings(FLIGHT_CACHE_TIMEOUT=300)
+class FlightCacheApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        departure_time = timezone.now() + datetime.timedelta(days=3)
+        self.flight = sample_flight(
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=3)
+        )
+        flight_cache.reset_stats()
+
+    def test_list_served_from_cache(self):
+        first = self.client.get(FLIGHT_URL, {"from": "san"})
+        second = self.client.get(FLIGHT_URL, {"from": "san"})
+
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            flight_cache.stats(),
+            {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+        )
+
+    def test_list_invalidated_by_ticket_sale(self):
+        self.client.get(FLIGHT_URL)
+        sample_ticket(flight=self.flight, order=sample_order(user=self.user))
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(
+            response.data["results"][0]["tickets_available"], 19
+        )
+
+    def test_list_invalidated_by_new_flight(self):
+        self.client.get(FLIGHT_URL)
+        sample_flight(
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=self.flight.departure_time,
+            arrival_time=self.flight.arrival_time
+        )
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 2)
+
+    def test_retrieve_invalidated_by_route_change(self):
+        self.client.get(detail_url(self.flight.id))
+        cached = self.client.get(detail_url(self.flight.id))
+
+        self.flight.route.distance = 1000
+        self.flight.route.save()
+        response = self.client.get(detail_url(self.flight.id))
+
+        self.assertEqual(cached.headers["X-Cache"], "HIT")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(response.data["route"]["distance"], 1000)
+
+
+class FlightDateWindowApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.date = timezone.localdate() + datetime.timedelta(days=10)
+        self.flight = self.sample_departure(self.date, 23)
+        self.early_flight = self.sample_departure(
+            self.date - datetime.timedelta(days=2), 1
+        )
+
+    @staticmethod
+    def sample_departure(date, hour):
+        departure_time = timezone.make_aware(
+            datetime.datetime.combine(date, datetime.time(hour))
+        )
+        return sample_flight(
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=2)
+        )
+
+    def get_ids(self, params):
+        response = self.client.get(FLIGHT_URL, params)
+        return {flight["id"] for flight in response.data["results"]}
+
+    def test_filter_by_departure_date_uses_local_day(self):
+        ids = self.get_ids({"departure_date": self.date.isoformat()})
+
+        self.assertEqual(ids, {self.flight.id})
+
+    def test_filter_by_departure_date_with_flex_days(self):
+        ids = self.get_ids(
+            {"departure_date": self.date.isoformat(), "flex_days": 2}
+        )
+
+        self.assertEqual(ids, {self.flight.id, self.early_flight.id})
+
+    def test_filter_by_departure_range(self):
+        day_before = self.date - datetime.timedelta(days=1)
+
+        self.assertEqual(
+            self.get_ids({"departure_to": day_before.isoformat()}),
+            {self.early_flight.id}
+        )
+        self.assertEqual(
+            self.get_ids({"departure_from": day_before.isoformat()}),
+            {self.flight.id}
+        )
+        self.assertEqual(
+            self.get_ids({
+                "departure_from": f"{self.date.isoformat()}T22:00",
+                "departure_to": f"{self.date.isoformat()}T23:00",
+            }),
+            set()
+        )
+
+    def test_filter_by_date_to_includes_whole_day(self):
+        self.assertEqual(
+            self.get_ids({"departure_to": self.date.isoformat()}),
+            {self.flight.id, self.early_flight.id}
+        )
+        self.assertEqual(
+            self.get_ids({
+                "departure_from": self.date.isoformat(),
+                "arrival_to": self.date.isoformat(),
+            }),
+            set()
+        )
+
+    def test_filter_by_out_of_range_dates(self):
+        for params in (
+            {"departure_date": "9999-12-31"},
+            {"departure_date": "0001-01-01", "flex_days": 3},
+            {"departure_to": "9999-12-31"},
+            {"arrival_from": "0001-01-01"},
+            {"arrival_from": "0001-01-01T00:00"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(FLIGHT_URL, params)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+    def test_filter_by_invalid_date(self):
+        response = self.client.get(FLIGHT_URL, {"departure_date": "25.03"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FlightCalendarApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+
+        today = timezone.localdate()
+        self.first_day = today.replace(day=1) + datetime.timedelta(days=40)
+        self.first_day = self.first_day.replace(day=1)
+        self.second_day = self.first_day + datetime.timedelta(days=4)
+        self.month = self.first_day.strftime("%Y-%m")
+
+        rome = sample_airport(name="Fiumicino", closest_big_city="Rome")
+        paris = sample_airport(name="Orly", closest_big_city="Paris")
+        route = sample_route(source=rome, destination=paris)
+        other_route = sample_route(
+            source=sample_airport(name="Ciampino", closest_big_city="Rome"),
+            destination=paris
+        )
+
+        self.flight = self.sample_departure(route, self.first_day)
+        self.sample_departure(other_route, self.first_day)
+        self.sample_departure(route, self.second_day)
+
+    @staticmethod
+    def sample_departure(route, date):
+        departure_time = timezone.make_aware(
+            datetime.datetime.combine(date, datetime.time(12))
+        )
+        return sample_flight(
+            route=route,
+            departure_time=departure_time,
+            arrival_time=departure_time + datetime.timedelta(hours=2)
+        )
+
+    def get_calendar(self):
+        return self.client.get(
+            CALENDAR_URL, {"from": "rome", "to": "paris", "month": self.month}
+        )
+
+    def test_calendar_groups_flights_by_day(self):
+        sample_ticket(flight=self.flight, order=sample_order(user=self.user))
+
+        response = self.get_calendar()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                {
+                    "date": self.first_day.isoformat(),
+                    "flights": 2,
+                    "min_seats_available": 19
+                },
+                {
+                    "date": self.second_day.isoformat(),
+                    "flights": 1,
+                    "min_seats_available": 20
+                },
+            ]
+        )
+
+    def test_calendar_invalidated_by_ticket_sale(self):
+        self.get_calendar()
+        sample_ticket(flight=self.flight, order=sample_order(user=self.user))
+
+        response = self.get_calendar()
+
+        self.assertEqual(response.data[0]["min_seats_available"], 19)
+
+    def test_calendar_invalid_month(self):
+        for month in ("03-2024", "9999-12", "0001-01"):
+            response = self.client.get(
+                CALENDAR_URL, {"from": "rome", "to": "paris", "month": month}
+            )
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+
+class FlightSeatHoldApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = {
+            "seats": [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}]
+        }
+
+    def hold_seats(self):
+        return self.client.post(
+            holds_url(self.flight.id), self.payload, format="json"
+        )
+
+    def order_seat(self, row, seat):
+        return self.client.post(
+            reverse("airport:order-list"),
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                ]
+            },
+            format="json"
+        )
+
+    def test_hold_seats(self):
+        response = self.hold_seats()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 2
+        )
+
+    def test_hold_seat_held_by_other_user(self):
+        SeatHold.objects.create(
+            flight=self.flight,
+            row=1,
+            seat=2,
+            user=sample_user(email="other@test.com"),
+            expires_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+
+        response = self.hold_seats()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["seats"][1]["non_field_errors"][0],
+            "This seat is held by another customer."
+        )
+
+    def test_expired_hold_of_other_user_is_replaced(self):
+        SeatHold.objects.create(
+            flight=self.flight,
+            row=1,
+            seat=2,
+            user=sample_user(email="other@test.com"),
+            expires_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+
+        response = self.hold_seats()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_order_converts_own_hold(self):
+        self.hold_seats()
+
+        response = self.order_seat(1, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(
+                SeatHold.objects.filter(user=self.user)
+                .values_list("row", "seat")
+            ),
+            [(1, 2)]
+        )
+
+    def test_order_rejects_seat_held_by_other_user(self):
+        self.hold_seats()
+        self.client.force_authenticate(sample_user(email="other@test.com"))
+
+        response = self.order_seat(1, 1)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_release_holds(self):
+        self.hold_seats()
+
+        response = self.client.delete(holds_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+
 class AdminFlightApiTests(TestCase):
 
     def setUp(self):
@@ -198,3 +745,29 @@ class AdminFlightApiTests(TestCase):
         response = self.client.delete(detail_url(self.flight.id))
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_cancel_flight_tickets_releases_seats_and_holds(self):
+        order = sample_order(user=sample_user())
+        for seat in (1, 2):
+            sample_ticket(flight=self.flight, order=order, row=1, seat=seat)
+        other_order = sample_order(user=order.user)
+        sample_ticket(
+            flight=sample_flight(), order=other_order, row=1, seat=1
+        )
+        SeatHold.objects.create(
+            flight=self.flight, row=1, seat=3, user=order.user,
+            expires_at=timezone.now() + datetime.timedelta(minutes=5)
+        )
+
+        response = self.client.post(
+            reverse("airport:flight-cancel-tickets", args=[self.flight.id])
+        )
+        self.flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"cancelled": 2})
+        self.assertEqual(self.flight.seats_sold, 0)
+        self.assertFalse(Ticket.objects.filter(flight=self.flight).exists())
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assertTrue(Order.objects.filter(pk=other_order.pk).exists())
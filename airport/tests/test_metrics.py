@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.metrics import metrics
+from airport.utils.samples import sample_airport, sample_user
+
+METRICS_URL = reverse("metrics")
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        metrics.reset()
+
+    def get_metrics(self):
+        return self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+    def test_requests_recorded_by_view_and_action(self):
+        sample_airport()
+        self.client.get(reverse("airport:airport-list"))
+        self.client.get(reverse("airport:airport-list"))
+
+        response = self.get_metrics()
+        content = response.content.decode()
+        labels = (
+            'view="airport:airport-list",action="list",method="GET"'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            f'airport_http_requests_total{{{labels},status="200"}} 2',
+            content
+        )
+        self.assertIn(
+            f'airport_http_request_duration_seconds_count{{{labels}}} 2',
+            content
+        )
+        self.assertIn(
+            f'airport_db_queries_per_request_bucket{{{labels},le="1"}} 0',
+            content
+        )
+        self.assertIn(
+            f'airport_db_queries_per_request_sum{{{labels}}} 4',
+            content
+        )
+        self.assertIn("airport_metrics_overhead_seconds_count 2", content)
+        self.assertNotIn('view="metrics"', content)
+
+    def test_unmatched_paths_share_one_series(self):
+        self.client.get("/api/airport/unknown/1/")
+        self.client.get("/api/airport/unknown/2/")
+
+        content = self.get_metrics().content.decode()
+
+        self.assertIn(
+            'airport_http_requests_total{view="unmatched",action="",'
+            'method="GET",status="404"} 2',
+            content
+        )
+
+    def test_token_required_when_configured(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.get_metrics()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_forbidden_without_token(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_served_to_internal_ips_in_debug_without_token(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -126,3 +126,31 @@ class TicketModelTest(TestCase):
 
         with self.assertRaises(ValidationError):
             sample_ticket(row=20, seat=35, order=order, flight=self.flight)
+
+    def test_ticket_creation_increments_seats_sold(self):
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 1)
+
+    def test_ticket_deletion_decrements_seats_sold(self):
+        self.ticket.delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_ticket_flight_change_moves_seats_sold(self):
+        other_flight = sample_flight()
+        self.ticket.flight = other_flight
+        self.ticket.save()
+
+        self.flight.refresh_from_db()
+        other_flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
+        self.assertEqual(other_flight.seats_sold, 1)
+
+    def test_order_deletion_releases_seats_sold(self):
+        self.ticket.order.delete()
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
@@ -0,0 +1,61 @@
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from airport.models import Flight, Route
+from airport.n_plus_one import NPlusOneMiddleware
+from airport.serializers.flight_serializers import FlightListSerializer
+from airport.serializers.route_serializers import RouteListSerializer
+from airport.utils.samples import sample_airport, sample_flight
+
+
+@override_settings(N_PLUS_ONE_SAMPLE_RATE=1, N_PLUS_ONE_THRESHOLD=3)
+class NPlusOneMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().get("/api/airport/flights/")
+
+    def serve(self, render):
+        def get_response(request):
+            render()
+            return HttpResponse()
+
+        return NPlusOneMiddleware(get_response)(self.request)
+
+    def test_repeated_lazy_loads_reported_with_field_and_location(self):
+        for _ in range(3):
+            sample_flight()
+
+        with self.assertLogs("airport.n_plus_one", "WARNING") as logs:
+            self.serve(
+                lambda: FlightListSerializer(
+                    Flight.objects.all(), many=True
+                ).data
+            )
+
+        messages = "\n".join(logs.output)
+        self.assertIn("FlightListSerializer.route", messages)
+        self.assertIn("airport/models.py", messages)
+        self.assertIn("in __str__", messages)
+
+    def test_select_related_is_not_reported(self):
+        source = sample_airport()
+        for index in range(3):
+            Route.objects.create(
+                source=source,
+                destination=sample_airport(name=f"Airport {index}"),
+                distance=100,
+            )
+
+        with self.assertNoLogs("airport.n_plus_one", "WARNING"):
+            self.serve(
+                lambda: RouteListSerializer(
+                    Route.objects.select_related("source", "destination"),
+                    many=True,
+                ).data
+            )
+
+    @override_settings(N_PLUS_ONE_SAMPLE_RATE=0)
+    def test_disabled_without_sample_rate(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(lambda request: HttpResponse())
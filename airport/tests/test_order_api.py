@@ -1,15 +1,36 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from airport.models import Order
+from airport import booking
+from airport.models import (
+    Flight,
+    IdempotencyKey,
+    Order,
+    OrderRequest,
+    Ticket,
+)
 from airport.serializers.order_serializers import OrderListSerializer
-from airport.utils.samples import sample_user, sample_order, sample_flight
+from airport.utils.samples import (
+    sample_user,
+    sample_order,
+    sample_flight,
+    sample_ticket
+)
 
 ORDER_URL = reverse("airport:order-list")
 
 
+def cancel_url(order_id):
+    return reverse("airport:order-cancel", args=[order_id])
+
+
 class UnauthenticatedOrderApiTests(TestCase):
 
     def setUp(self):
@@ -39,6 +60,40 @@ class AuthenticatedOrderApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data.get("results"), serializer.data)
 
+    def test_list_order_with_tickets_matches_list_serializer(self):
+        flights = [sample_flight(), sample_flight()]
+        for seat in range(1, 4):
+            order = sample_order(user=self.user)
+            for flight in flights:
+                sample_ticket(flight=flight, order=order, row=1, seat=seat)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(ORDER_URL, {"page_size": 10})
+
+        orders = Order.objects.filter(user=self.user).prefetch_related(
+            "tickets__flight__route__source",
+            "tickets__flight__route__destination",
+            "tickets__flight__airplane"
+        )
+        serializer = OrderListSerializer(orders, many=True)
+        self.assertEqual(response.data.get("results"), serializer.data)
+
+    def test_list_order_with_cursor_pagination(self):
+        orders = [sample_order(user=self.user) for _ in range(3)]
+
+        response = self.client.get(ORDER_URL, {"pagination": "cursor"})
+        next_page = self.client.get(response.data.get("next"))
+
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            [order["id"] for order in response.data.get("results")],
+            [orders[2].id, orders[1].id]
+        )
+        self.assertEqual(
+            [order["id"] for order in next_page.data.get("results")],
+            [orders[0].id]
+        )
+
     def test_create_order_with_ticket(self):
         ticket_data = {
             "row": 1,
@@ -63,3 +118,332 @@ class AuthenticatedOrderApiTests(TestCase):
             response.data.get("tickets").get("non_field_errors")[0],
             "This list may not be empty."
         )
+
+    def test_create_order_with_many_tickets_updates_seats_sold(self):
+        flight = sample_flight()
+        data = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": flight.id}
+                for seat in range(1, 4)
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, data, format="json")
+        flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 3)
+        self.assertEqual(flight.seats_sold, 3)
+
+    def test_create_order_with_duplicate_seats(self):
+        flight = sample_flight()
+        ticket_data = {"row": 1, "seat": 1, "flight": flight.id}
+        data = {"tickets": [ticket_data, ticket_data]}
+
+        response = self.client.post(ORDER_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data.get("tickets")[0], {})
+        self.assertEqual(
+            response.data.get("tickets")[1].get("non_field_errors")[0],
+            "The fields row, seat, flight must make a unique set."
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_with_taken_seat(self):
+        flight = sample_flight()
+        sample_ticket(
+            flight=flight,
+            order=sample_order(user=self.user),
+            row=1,
+            seat=2
+        )
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 2, "flight": flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get("tickets"),
+            [
+                {},
+                {
+                    "non_field_errors": [
+                        "The fields row, seat, flight must make a unique set."
+                    ]
+                },
+            ]
+        )
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        flight = sample_flight()
+
+        def post_tickets(row, seats_count):
+            return self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": flight.id}
+                        for seat in range(1, seats_count + 1)
+                    ]
+                },
+                format="json"
+            )
+
+        with self.assertNumQueries(13):
+            post_tickets(row=1, seats_count=1)
+        with self.assertNumQueries(13):
+            post_tickets(row=2, seats_count=10)
+
+    def test_create_order_with_seat_sold_while_waiting_for_lock(self):
+        flight = sample_flight()
+        other_order = sample_order(user=sample_user(email="other@test.com"))
+
+        def sell_seat_first(flight_ids):
+            Ticket.objects.create(
+                flight=flight, order=other_order, row=1, seat=1
+            )
+
+        with mock.patch.object(
+            booking, "lock_flights", side_effect=sell_seat_first
+        ):
+            response = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data.get("tickets")[0].get("non_field_errors")[0],
+            "The fields row, seat, flight must make a unique set."
+        )
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
+
+    @override_settings(BOOKING_MAX_RETRIES=2, BOOKING_RETRY_DELAY=0)
+    def test_create_order_retries_lock_conflicts(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+
+        with mock.patch.object(
+            booking,
+            "lock_flights",
+            side_effect=[OperationalError("deadlock detected"), None],
+        ) as lock_flights:
+            response = self.client.post(ORDER_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(lock_flights.call_count, 2)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Flight.objects.get(pk=flight.pk).seats_sold, 1)
+
+    def test_create_order_with_idempotency_key_replays_response(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+
+        response = self.client.post(
+            ORDER_URL, data, format="json", HTTP_IDEMPOTENCY_KEY="order-1"
+        )
+        with self.assertNumQueries(1):
+            replay = self.client.post(
+                ORDER_URL, data, format="json", HTTP_IDEMPOTENCY_KEY="order-1"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data, response.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Ticket.objects.filter(flight=flight).count(), 1)
+
+    def test_create_order_with_reused_idempotency_key_and_other_body(self):
+        flight = sample_flight()
+
+        for seat, expected_status in (
+            (1, status.HTTP_201_CREATED),
+            (2, status.HTTP_422_UNPROCESSABLE_ENTITY),
+        ):
+            response = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": seat, "flight": flight.id}]},
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="order-1"
+            )
+            self.assertEqual(response.status_code, expected_status)
+
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_failed_order_does_not_store_idempotency_key(self):
+        flight = sample_flight()
+        ticket_data = {"row": 1, "seat": 1, "flight": flight.id}
+
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [ticket_data, ticket_data]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="order-1"
+        )
+        retry = self.client.post(
+            ORDER_URL,
+            {"tickets": [ticket_data]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="order-1"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_idempotency_keys_are_scoped_by_user(self):
+        flight = sample_flight()
+        other_client = APIClient()
+        other_client.force_authenticate(
+            sample_user(email="other@test.com")
+        )
+
+        for client, seat in ((self.client, 1), (other_client, 2)):
+            response = client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": seat, "flight": flight.id}]},
+                format="json",
+                HTTP_IDEMPOTENCY_KEY="order-1"
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_create_order_with_respond_async_queues_request(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+
+        response = self.client.post(
+            ORDER_URL, data, format="json", HTTP_PREFER="respond-async"
+        )
+        order_request = OrderRequest.objects.get(user=self.user)
+        status_response = self.client.get(response["Location"])
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertEqual(order_request.tickets, data["tickets"])
+        self.assertEqual(status_response.data["id"], order_request.id)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_replayed_async_order_keeps_location(self):
+        flight = sample_flight()
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+        headers = {
+            "HTTP_PREFER": "respond-async",
+            "HTTP_IDEMPOTENCY_KEY": "async-key",
+        }
+
+        response = self.client.post(ORDER_URL, data, format="json", **headers)
+        replayed = self.client.post(ORDER_URL, data, format="json", **headers)
+
+        self.assertEqual(replayed.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(replayed["Location"], response["Location"])
+        self.assertEqual(replayed["Preference-Applied"], "respond-async")
+        self.assertEqual(OrderRequest.objects.count(), 1)
+
+    @override_settings(ORDER_INTAKE_ASYNC=True)
+    def test_async_intake_validates_request_shape_only(self):
+        ticket_data = {"row": 1, "seat": 1, "flight": 999}
+
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [ticket_data, ticket_data]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][1]["non_field_errors"][0],
+            "The fields row, seat, flight must make a unique set."
+        )
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def create_upcoming_order(self, seats):
+        flight = sample_flight(
+            departure_time=timezone.now() + datetime.timedelta(days=1),
+            arrival_time=timezone.now() + datetime.timedelta(days=2),
+        )
+        response = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": seat, "flight": flight.id}
+                    for seat in seats
+                ]
+            },
+            format="json"
+        )
+        return Order.objects.get(pk=response.data["id"]), flight
+
+    def test_cancel_some_tickets_of_order(self):
+        order, flight = self.create_upcoming_order(seats=(1, 2, 3))
+        ticket_ids = list(
+            order.tickets.filter(seat__lte=2).values_list("id", flat=True)
+        )
+
+        response = self.client.post(
+            cancel_url(order.id), {"tickets": ticket_ids}, format="json"
+        )
+        flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"cancelled": 2})
+        self.assertEqual(
+            list(order.tickets.values_list("seat", flat=True)), [3]
+        )
+        self.assertEqual(flight.seats_sold, 1)
+
+    def test_cancel_whole_order_deletes_it(self):
+        order, flight = self.create_upcoming_order(seats=(1, 2))
+
+        response = self.client.post(cancel_url(order.id))
+        flight.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"cancelled": 2})
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assertEqual(flight.seats_sold, 0)
+
+    def test_cancel_with_foreign_ticket(self):
+        order, _ = self.create_upcoming_order(seats=(1,))
+        other_ticket = sample_ticket(
+            order=sample_order(user=sample_user(email="other@test.com"))
+        )
+
+        response = self.client.post(
+            cancel_url(order.id),
+            {"tickets": [other_ticket.id]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Ticket.objects.filter(pk=other_ticket.pk).exists())
+
+    def test_cancel_ticket_of_departed_flight(self):
+        order = sample_order(user=self.user)
+        sample_ticket(order=order)
+
+        response = self.client.post(cancel_url(order.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][0],
+            "Tickets of departed flights cannot be cancelled."
+        )
+
+    def test_cancel_order_of_other_user(self):
+        order = sample_order(user=sample_user(email="other@test.com"))
+
+        response = self.client.post(cancel_url(order.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,484 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    OrderRequest,
+    Route,
+    Ticket,
+)
+from airport.tests.query_budget import QueryBudgetMixin
+from airport.utils.airport_index import airport_index
+from airport.utils.itineraries import flight_graph
+from airport.utils.route_graph import route_graph
+from airport.utils.samples import (
+    sample_airplane,
+    sample_airplane_type,
+    sample_airport,
+    sample_crew,
+    sample_superuser,
+    sample_user,
+)
+
+
+@override_settings(FLIGHT_CACHE_TIMEOUT=0)
+class EndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        # Built indexes are patched on every save, start without them
+        airport_index.invalidate()
+        route_graph.invalidate()
+        flight_graph.invalidate()
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane(rows=20, seats_in_row=12)
+        self.source = sample_airport(name="Source")
+        self.destination = sample_airport(
+            name="Destination", closest_big_city="Paris"
+        )
+        self.route = Route.objects.create(
+            source=self.source, destination=self.destination, distance=500
+        )
+        self.flights = []
+
+    def tearDown(self):
+        # Requests of every dataset size count against user throttling
+        cache.clear()
+
+    def get(self, url_name, *args, **params):
+        return lambda: self.client.get(reverse(url_name, args=args), params)
+
+    def post(self, url_name, data):
+        return lambda: self.client.post(
+            reverse(url_name), data, format="json"
+        )
+
+    def grow_flights(self, size):
+        departure_time = timezone.now() + datetime.timedelta(days=1)
+        while len(self.flights) < size:
+            flight = Flight.objects.create(
+                route=self.route,
+                airplane=self.airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + datetime.timedelta(hours=2),
+            )
+            flight.crew.add(sample_crew())
+            self.flights.append(flight)
+
+    def grow_routes(self, size):
+        while Route.objects.count() < size:
+            Route.objects.create(
+                source=self.source,
+                destination=sample_airport(name="Other"),
+                distance=100,
+            )
+
+    def test_crew_list(self):
+        self.assertQueryBudget(
+            self.get("airport:crew-list"),
+            lambda size: [sample_crew() for _ in range(size)],
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_airplane_type_list(self):
+        self.assertQueryBudget(
+            self.get("airport:airplanetype-list"),
+            lambda size: [sample_airplane_type() for _ in range(size)],
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_airplane_list(self):
+        self.assertQueryBudget(
+            self.get("airport:airplane-list"),
+            lambda size: [sample_airplane() for _ in range(size)],
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_airplane_retrieve(self):
+        self.assertQueryBudget(
+            self.get("airport:airplane-detail", self.airplane.id),
+            lambda size: [sample_airplane() for _ in range(size)],
+            max_queries=1,
+            max_rows=1,
+        )
+
+    def test_airport_list(self):
+        self.assertQueryBudget(
+            self.get("airport:airport-list"),
+            lambda size: [sample_airport() for _ in range(size)],
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_airport_retrieve(self):
+        self.assertQueryBudget(
+            self.get("airport:airport-detail", self.source.id),
+            lambda size: [sample_airport() for _ in range(size)],
+            max_queries=1,
+            max_rows=1,
+        )
+
+    def test_route_list(self):
+        self.assertQueryBudget(
+            self.get("airport:route-list"),
+            self.grow_routes,
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_route_list_with_cursor(self):
+        self.assertQueryBudget(
+            self.get("airport:route-list", pagination="cursor"),
+            self.grow_routes,
+            max_queries=1,
+            max_rows=6,
+        )
+
+    def test_route_retrieve(self):
+        self.assertQueryBudget(
+            self.get("airport:route-detail", self.route.id),
+            self.grow_routes,
+            max_queries=1,
+            max_rows=1,
+        )
+
+    def test_flight_list(self):
+        self.assertQueryBudget(
+            self.get("airport:flight-list"),
+            self.grow_flights,
+            max_queries=2,
+            max_rows=6,
+        )
+
+    def test_flight_seatmap_with_growing_tickets(self):
+        self.grow_flights(1)
+        flight = self.flights[0]
+
+        def grow_tickets(size):
+            while flight.tickets.count() < size:
+                Ticket.objects.create(
+                    order=Order.objects.create(user=self.user),
+                    flight=flight,
+                    row=1,
+                    seat=flight.tickets.count() + 1,
+                )
+
+        self.assertQueryBudget(
+            self.get("airport:flight-seatmap", flight.id),
+            grow_tickets,
+            max_queries=3,
+            max_rows=14,
+        )
+
+        url = reverse("airport:flight-seatmap", args=[flight.id])
+        etags = []
+
+        def grow_tickets_and_get_etag(size):
+            grow_tickets(size)
+            etags.append(self.client.get(url).headers["ETag"])
+
+        self.assertQueryBudget(
+            lambda: self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1]),
+            grow_tickets_and_get_etag,
+            max_queries=2,
+            max_rows=2,
+            expected_status=304,
+        )
+
+    def test_flight_calendar(self):
+        month = timezone.localdate() + datetime.timedelta(days=1)
+        self.assertQueryBudget(
+            self.get(
+                "airport:flight-calendar",
+                **{
+                    "from": self.source.closest_big_city,
+                    "to": self.destination.closest_big_city,
+                    "month": month.strftime("%Y-%m"),
+                }
+            ),
+            self.grow_flights,
+            max_queries=1,
+            max_rows=1,
+        )
+
+    def test_flight_itineraries(self):
+        date = timezone.localdate() + datetime.timedelta(days=1)
+        itineraries = self.get(
+            "airport:flight-itineraries",
+            **{
+                "from": self.source.closest_big_city,
+                "to": self.destination.closest_big_city,
+                "date": date.isoformat(),
+            }
+        )
+
+        def grow_flights(size):
+            self.grow_flights(size)
+            # The in-memory graph is built by the first search only
+            itineraries()
+
+        self.assertQueryBudget(
+            itineraries,
+            grow_flights,
+            max_queries=1,
+            max_rows=5,
+        )
+
+    def test_flight_retrieve_with_growing_crew(self):
+        self.grow_flights(1)
+        flight = self.flights[0]
+
+        def grow_crew(size):
+            while flight.crew.count() < size:
+                flight.crew.add(sample_crew())
+
+        self.assertQueryBudget(
+            self.get("airport:flight-detail", flight.id),
+            grow_crew,
+            max_queries=3,
+            max_rows=13,
+        )
+
+    def test_order_list(self):
+        self.grow_flights(1)
+        flight = self.flights[0]
+
+        def grow_orders(size):
+            while Order.objects.count() < size:
+                order = Order.objects.create(user=self.user)
+                for seat in range(1, 4):
+                    Ticket.objects.create(
+                        order=order,
+                        flight=flight,
+                        row=Order.objects.count(),
+                        seat=seat,
+                    )
+
+        self.assertQueryBudget(
+            self.get("airport:order-list", page_size=10),
+            grow_orders,
+            max_queries=4,
+            max_rows=42,
+        )
+
+    def test_order_request_list_and_retrieve(self):
+        def grow_order_requests(size):
+            while OrderRequest.objects.count() < size:
+                OrderRequest.objects.create(
+                    user=self.user,
+                    tickets=[{"row": 1, "seat": 1, "flight": 1}],
+                )
+
+        self.assertQueryBudget(
+            self.get("airport:orderrequest-list", page_size=10),
+            grow_order_requests,
+            max_queries=2,
+            max_rows=11,
+        )
+        self.assertQueryBudget(
+            self.get(
+                "airport:orderrequest-detail",
+                OrderRequest.objects.earliest("id").id,
+            ),
+            grow_order_requests,
+            max_queries=1,
+            max_rows=1,
+        )
+
+    def test_order_create_with_growing_tickets(self):
+        self.grow_flights(1)
+        flight = self.flights[0]
+        rows = iter(range(1, 21))
+        tickets_count = [0]
+
+        def grow_tickets(size):
+            tickets_count[0] = size
+
+        def create_order():
+            row = next(rows)
+            return self.client.post(
+                reverse("airport:order-list"),
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": flight.id}
+                        for seat in range(1, tickets_count[0] + 1)
+                    ]
+                },
+                format="json"
+            )
+
+        self.assertQueryBudget(
+            create_order,
+            grow_tickets,
+            max_queries=13,
+            max_rows=28,
+            expected_status=201,
+        )
+
+    def test_staff_crew_create(self):
+        self.client.force_authenticate(sample_superuser())
+
+        self.assertQueryBudget(
+            lambda: self.client.post(
+                reverse("airport:crew-list"),
+                {"first_name": "Jane", "last_name": "Doe"},
+            ),
+            lambda size: [sample_crew() for _ in range(size)],
+            max_queries=1,
+            max_rows=1,
+            expected_status=201,
+        )
+        self.assertEqual(Crew.objects.filter(first_name="Jane").count(), 3)
+
+    def test_staff_airplane_type_create(self):
+        self.client.force_authenticate(sample_superuser())
+
+        self.assertQueryBudget(
+            self.post("airport:airplanetype-list", {"name": "Jet"}),
+            lambda size: [sample_airplane_type() for _ in range(size)],
+            max_queries=1,
+            max_rows=1,
+            expected_status=201,
+        )
+        self.assertEqual(AirplaneType.objects.filter(name="Jet").count(), 3)
+
+    def test_staff_airplane_create(self):
+        self.client.force_authenticate(sample_superuser())
+
+        self.assertQueryBudget(
+            self.post(
+                "airport:airplane-list",
+                {
+                    "name": "Jet",
+                    "rows": 10,
+                    "seats_in_row": 4,
+                    "airplane_type": self.airplane.airplane_type_id,
+                },
+            ),
+            lambda size: [sample_airplane() for _ in range(size)],
+            max_queries=2,
+            max_rows=2,
+            expected_status=201,
+        )
+        self.assertEqual(Airplane.objects.filter(name="Jet").count(), 3)
+
+    def test_staff_airport_create(self):
+        self.client.force_authenticate(sample_superuser())
+
+        self.assertQueryBudget(
+            self.post(
+                "airport:airport-list",
+                {"name": "Orly", "closest_big_city": "Paris"},
+            ),
+            lambda size: [sample_airport() for _ in range(size)],
+            max_queries=1,
+            max_rows=1,
+            expected_status=201,
+        )
+        self.assertEqual(Airport.objects.filter(name="Orly").count(), 3)
+
+    def test_staff_route_create(self):
+        self.client.force_authenticate(sample_superuser())
+        destinations = iter([
+            sample_airport(name=f"New {index}") for index in range(3)
+        ])
+
+        self.assertQueryBudget(
+            lambda: self.client.post(
+                reverse("airport:route-list"),
+                {
+                    "source": self.source.id,
+                    "destination": next(destinations).id,
+                    "distance": 1000,
+                },
+            ),
+            self.grow_routes,
+            max_queries=4,
+            max_rows=3,
+            expected_status=201,
+        )
+
+    def test_staff_flight_create(self):
+        self.client.force_authenticate(sample_superuser())
+        departure_time = timezone.now() + datetime.timedelta(days=2)
+
+        self.assertQueryBudget(
+            self.post(
+                "airport:flight-list",
+                {
+                    "route": self.route.id,
+                    "airplane": self.airplane.id,
+                    "departure_time": departure_time,
+                    "arrival_time": (
+                        departure_time + datetime.timedelta(hours=2)
+                    ),
+                    "crew": [sample_crew().id, sample_crew().id],
+                },
+            ),
+            self.grow_flights,
+            max_queries=9,
+            max_rows=7,
+            expected_status=201,
+        )
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    @staticmethod
+    def grow_users(size):
+        while get_user_model().objects.count() < size:
+            sample_user(email=f"user{get_user_model().objects.count()}@a.com")
+
+    def test_register(self):
+        emails = iter(f"new{index}@test.com" for index in range(3))
+
+        self.assertQueryBudget(
+            lambda: self.client.post(
+                reverse("user:register"),
+                {
+                    "email": next(emails),
+                    "password": "Strong-password-1",
+                    "first_name": "Jane",
+                    "last_name": "Doe",
+                },
+            ),
+            self.grow_users,
+            max_queries=2,
+            max_rows=1,
+            expected_status=201,
+        )
+
+    def test_me(self):
+        user = sample_user(email="me@test.com")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("user:manage")),
+            self.grow_users,
+            max_queries=1,
+            max_rows=1,
+        )
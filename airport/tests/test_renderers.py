@@ -0,0 +1,70 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from airport.parsers import FastJSONParser
+from airport.renderers import FastJSONRenderer
+from airport.utils.samples import sample_user
+
+
+class FastJSONRendererTests(TestCase):
+
+    def test_renders_like_stdlib_renderer(self):
+        data = {
+            "created_at": datetime.datetime(
+                2024, 4, 1, 8, 30, tzinfo=datetime.timezone.utc
+            ),
+            "local": timezone.localtime(
+                datetime.datetime(2024, 4, 1, 8, tzinfo=datetime.timezone.utc)
+            ),
+            "date": datetime.date(2024, 4, 1),
+            "price": Decimal("9.90"),
+            "id": uuid.UUID(int=1),
+            "name": "Kyiv   Київ",
+            1: [None, True, 1.5],
+        }
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indented_output_falls_back_to_stdlib(self):
+        data = {"id": 1}
+        context = {"indent": 4}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json", context),
+            JSONRenderer().render(data, "application/json", context),
+        )
+
+    def test_api_uses_fast_renderer(self):
+        client = APIClient()
+        client.force_authenticate(sample_user())
+
+        response = client.get(reverse("airport:airport-list"))
+
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+
+
+class FastJSONParserTests(TestCase):
+
+    def parse(self, content):
+        return FastJSONParser().parse(io.BytesIO(content))
+
+    def test_parses_utf8_body(self):
+        self.assertEqual(
+            self.parse('{"city": "Київ"}'.encode()), {"city": "Київ"}
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        for content in (b"{", b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(content)
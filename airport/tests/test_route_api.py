@@ -8,6 +8,7 @@ from airport.serializers.route_serializers import (
     RouteListSerializer,
     RouteDetailSerializer
 )
+from airport.utils.route_graph import route_graph
 from airport.utils.samples import (
     sample_user,
     sample_superuser,
@@ -16,6 +17,7 @@ from airport.utils.samples import (
 )
 
 ROUTE_URL = reverse("airport:route-list")
+PATHS_URL = reverse("airport:route-paths")
 
 
 def detail_url(route_id):
@@ -72,6 +74,46 @@ class AuthenticatedRouteTypeApiTests(TestCase):
         self.assertNotIn(serializer1.data, res.data.get("results"))
         self.assertIn(serializer2.data, res.data.get("results"))
 
+    def test_list_routes_with_cursor_pagination(self):
+        for index in range(5):
+            sample_route(
+                source=sample_airport(name=f"Source {index}"),
+                destination=sample_airport(name=f"Destination {index}")
+            )
+
+        response = self.client.get(ROUTE_URL, {"pagination": "cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data.get("results")), 5)
+
+        next_page = self.client.get(response.data.get("next"))
+        ids = [
+            route["id"]
+            for route in response.data.get("results")
+            + next_page.data.get("results")
+        ]
+
+        self.assertEqual(
+            ids, list(Route.objects.order_by("id").values_list("id", flat=True))
+        )
+
+    def test_filter_routes_by_source_prefix(self):
+        res = self.client.get(ROUTE_URL, {"source": "mon", "match": "prefix"})
+        res_inner = self.client.get(
+            ROUTE_URL, {"source": "naco", "match": "prefix"}
+        )
+
+        serializer = RouteListSerializer(self.other_route)
+
+        self.assertEqual(res.data.get("results"), [serializer.data])
+        self.assertEqual(res_inner.data.get("results"), [])
+
+    def test_filter_routes_with_invalid_match(self):
+        res = self.client.get(ROUTE_URL, {"source": "mon", "match": "fuzzy"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_retrieve_route_detail(self):
         response = self.client.get(detail_url(self.route.id))
         serializer = RouteDetailSerializer(self.route)
@@ -134,3 +176,90 @@ class AdminRouteApiTests(TestCase):
         res = self.client.delete(detail_url(self.route.id))
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class RoutePathsApiTests(TestCase):
+
+    def setUp(self):
+        route_graph.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.kyiv, self.warsaw, self.berlin, self.paris = (
+            sample_airport(name=name, closest_big_city=name)
+            for name in ("Kyiv", "Warsaw", "Berlin", "Paris")
+        )
+        self.routes = {
+            (source, destination): Route.objects.create(
+                source=source, destination=destination, distance=distance
+            )
+            for source, destination, distance in (
+                (self.kyiv, self.warsaw, 700),
+                (self.warsaw, self.berlin, 500),
+                (self.berlin, self.paris, 900),
+                (self.kyiv, self.paris, 2500),
+            )
+        }
+
+    def paths(self, **params):
+        return self.client.get(PATHS_URL, params)
+
+    def test_shortest_path_by_distance(self):
+        response = self.paths(source=self.kyiv.id, destination=self.paris.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["distance"], 2100)
+        self.assertEqual(
+            [airport["name"] for airport in response.data["airports"]],
+            ["Kyiv", "Warsaw", "Berlin", "Paris"]
+        )
+        self.assertEqual(
+            response.data["routes"],
+            [
+                self.routes[(self.kyiv, self.warsaw)].id,
+                self.routes[(self.warsaw, self.berlin)].id,
+                self.routes[(self.berlin, self.paris)].id,
+            ]
+        )
+
+    def test_shortest_path_with_max_legs(self):
+        response = self.paths(
+            source=self.kyiv.id, destination=self.paris.id, max_legs=2
+        )
+
+        self.assertEqual(response.data["distance"], 2500)
+
+    def test_no_path(self):
+        response = self.paths(source=self.paris.id, destination=self.kyiv.id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reachable_within_distance(self):
+        response = self.paths(source=self.kyiv.id, max_distance=1200)
+
+        self.assertEqual(
+            [
+                (item["airport"]["name"], item["distance"], item["legs"])
+                for item in response.data
+            ],
+            [("Warsaw", 700, 1), ("Berlin", 1200, 2)]
+        )
+
+    def test_graph_follows_route_changes(self):
+        self.paths(source=self.kyiv.id, destination=self.paris.id)
+        route = self.routes[(self.kyiv, self.paris)]
+        route.distance = 1000
+        route.save()
+        self.routes[(self.warsaw, self.berlin)].delete()
+
+        with self.assertNumQueries(0):
+            response = self.paths(
+                source=self.kyiv.id, destination=self.paris.id
+            )
+
+        self.assertEqual(response.data["routes"], [route.id])
+        self.assertEqual(response.data["distance"], 1000)
+
+    def test_paths_with_unknown_airport(self):
+        response = self.paths(source=self.kyiv.id, destination=999)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -8,6 +8,8 @@ from airport.views import (
     RouteViewSet,
     FlightViewSet,
     OrderViewSet,
+    OrderRequestViewSet,
+    ExportViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -18,6 +20,8 @@ router.register("airports", AirportViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
+router.register("order_requests", OrderRequestViewSet)
+router.register("exports", ExportViewSet, basename="export")
 
 urlpatterns = router.urls
 
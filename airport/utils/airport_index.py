@@ -0,0 +1,158 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count
+from rest_framework import serializers
+
+from airport.models import Airport, Route
+from airport.utils.date_windows import parse_int
+
+
+def normalize(text):
+    return " ".join(text.casefold().split())
+
+
+def index_keys(airport):
+    """Every word suffix of the name and city, so any word is a prefix"""
+    keys = set()
+    for text in (airport["name"], airport["closest_big_city"]):
+        words = normalize(text).split(" ")
+        keys.update(" ".join(words[index:]) for index in range(len(words)))
+    keys.discard("")
+    return keys
+
+
+class AirportIndex:
+    """In-memory prefix index of airport names and cities
+
+    Keys are kept in one sorted list of (key, airport id) pairs, so a
+    prefix lookup is a bisect followed by a scan of matching keys.
+    Matches are ranked by the number of routes of an airport. The index
+    is built lazily, patched by Airport and Route signals and rebuilt
+    after AIRPORT_INDEX_TTL seconds, which bounds staleness across
+    processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = None
+        self._airports = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+
+    def _ensure_built(self):
+        ttl = getattr(settings, "AIRPORT_INDEX_TTL", 300)
+        if self._keys is not None and time.monotonic() - self._built_at < ttl:
+            return
+
+        route_counts = Counter()
+        for field in ("source_id", "destination_id"):
+            route_counts.update(dict(
+                Route.objects
+                .order_by()
+                .values_list(field)
+                .annotate(count=Count("id"))
+            ))
+
+        self._airports = {}
+        keys = []
+        for airport in (
+            Airport.objects
+            .values("id", "name", "closest_big_city")
+            .iterator(chunk_size=2000)
+        ):
+            airport["routes"] = route_counts[airport["id"]]
+            self._airports[airport["id"]] = airport
+            keys.extend((key, airport["id"]) for key in index_keys(airport))
+        keys.sort()
+        self._keys = keys
+        self._built_at = time.monotonic()
+
+    def _remove(self, airport_id):
+        airport = self._airports.pop(airport_id, None)
+        if airport is not None:
+            for key in index_keys(airport):
+                index = bisect.bisect_left(self._keys, (key, airport_id))
+                if index < len(self._keys) and self._keys[index] == (
+                    key, airport_id
+                ):
+                    del self._keys[index]
+
+    def _add(self, airport):
+        self._airports[airport["id"]] = airport
+        for key in index_keys(airport):
+            bisect.insort(self._keys, (key, airport["id"]))
+
+    def refresh_airport(self, airport_id):
+        with self._lock:
+            if self._keys is None:
+                return
+            routes = self._airports.get(airport_id, {}).get("routes", 0)
+            self._remove(airport_id)
+            airport = (
+                Airport.objects
+                .filter(pk=airport_id)
+                .values("id", "name", "closest_big_city")
+                .first()
+            )
+            if airport is not None:
+                airport["routes"] = routes
+                self._add(airport)
+
+    def remove_airport(self, airport_id):
+        with self._lock:
+            if self._keys is not None:
+                self._remove(airport_id)
+
+    def refresh_route_counts(self, airport_ids):
+        with self._lock:
+            if self._keys is None:
+                return
+            airport_ids = set(airport_ids) & self._airports.keys()
+            for airport_id in airport_ids:
+                self._airports[airport_id]["routes"] = Route.objects.filter(
+                    source_id=airport_id
+                ).count() + Route.objects.filter(
+                    destination_id=airport_id
+                ).count()
+
+    def search(self, query, limit):
+        """Airports with a name or city word starting with query"""
+        prefix = normalize(query)
+        with self._lock:
+            self._ensure_built()
+            matches = set()
+            index = bisect.bisect_left(self._keys, (prefix,))
+            while index < len(self._keys):
+                key, airport_id = self._keys[index]
+                if not key.startswith(prefix):
+                    break
+                matches.add(airport_id)
+                index += 1
+
+            return heapq.nsmallest(
+                limit,
+                (self._airports[airport_id] for airport_id in matches),
+                key=lambda airport: (
+                    -airport["routes"], airport["name"], airport["id"]
+                ),
+            )
+
+
+airport_index = AirportIndex()
+
+
+def autocomplete_airports(query_params):
+    query = query_params.get("q", "")
+    if not normalize(query):
+        raise serializers.ValidationError({"q": "This parameter is required."})
+    return airport_index.search(
+        query, parse_int(query_params, "limit", 10, 1, 50)
+    )
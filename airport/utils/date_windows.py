@@ -0,0 +1,117 @@
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def parse_date(value, name):
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        raise serializers.ValidationError(
+            {name: "Date has wrong format. Use YYYY-MM-DD."}
+        )
+
+
+def start_of_day(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def in_range(moment, name):
+    """Reject moments the database cannot store once converted to UTC"""
+    try:
+        moment.astimezone(dt_timezone.utc)
+    except OverflowError:
+        raise serializers.ValidationError({name: "Date is out of range."})
+    return moment
+
+
+def shifted_day_start(date, days, name):
+    try:
+        shifted = date + timedelta(days=days)
+    except OverflowError:
+        raise serializers.ValidationError({name: "Date is out of range."})
+    return in_range(start_of_day(shifted), name)
+
+
+def day_range(date, days_before=0, days_after=0, name="date"):
+    """Half-open [start, end) range of local days around a date"""
+    return (
+        shifted_day_start(date, -days_before, name),
+        shifted_day_start(date, days_after + 1, name),
+    )
+
+
+def parse_bound(value, name, end=False):
+    """Parse a date or datetime into an aware range bound
+
+    A plain date means the start of that local day, or the start of the
+    following day when used as an end bound, so the whole day is included.
+    """
+    # parse_datetime() reads a plain date as midnight on Python 3.11+
+    if "T" not in value and " " not in value:
+        return shifted_day_start(parse_date(value, name), int(end), name)
+
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise serializers.ValidationError(
+            {name: "Datetime has wrong format. Use YYYY-MM-DD[THH:MM]."}
+        )
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return in_range(moment, name)
+
+
+def parse_int(query_params, name, default, minimum, maximum):
+    value = query_params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError(
+            {name: "A valid integer is required."}
+        )
+    if not minimum <= value <= maximum:
+        raise serializers.ValidationError(
+            {name: f"Must be between {minimum} and {maximum}."}
+        )
+    return value
+
+
+def parse_flex_days(query_params, maximum=7):
+    return parse_int(query_params, "flex_days", 0, 0, maximum)
+
+
+def filter_time_window(queryset, field, query_params, prefix):
+    """Filter by ?<prefix>_date=&flex_days= and ?<prefix>_from=&<prefix>_to=
+
+    Every filter becomes a half-open range on the raw column, so it can be
+    served by an index instead of casting each row to a date.
+    """
+    if value := query_params.get(f"{prefix}_date"):
+        flex_days = parse_flex_days(query_params)
+        start, end = day_range(
+            parse_date(value, f"{prefix}_date"),
+            flex_days,
+            flex_days,
+            f"{prefix}_date",
+        )
+        queryset = queryset.filter(
+            **{f"{field}__gte": start, f"{field}__lt": end}
+        )
+
+    if value := query_params.get(f"{prefix}_from"):
+        start = parse_bound(value, f"{prefix}_from")
+        queryset = queryset.filter(**{f"{field}__gte": start})
+
+    if value := query_params.get(f"{prefix}_to"):
+        end = parse_bound(value, f"{prefix}_to", end=True)
+        queryset = queryset.filter(**{f"{field}__lt": end})
+
+    return queryset
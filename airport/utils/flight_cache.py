@@ -0,0 +1,176 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "flights:version:catalog"
+ROUTE_VERSION_KEY = "flights:version:route:{}"
+FLIGHT_ROUTE_KEY = "flights:route_of:{}"
+VERSIONED_KEY = "flights:{}:{}:{}"
+DETAIL_KEY = "flights:detail:{}:{}:{}"
+HITS_KEY = "flights:stats:hits"
+MISSES_KEY = "flights:stats:misses"
+
+
+class FlightCache:
+    """Response cache of flight list, detail and calendar endpoints
+
+    Entries are never deleted, they become unreachable when a version
+    counter they were stored under changes. Every list page or calendar
+    remembers versions of routes it shows, so selling a ticket only
+    invalidates entries of that route. Changes that may add, remove or reorder
+    flights bump the catalog version shared by all entries.
+
+    Backed by the FLIGHT_CACHE_ALIAS entry of CACHES, FLIGHT_CACHE_TIMEOUT
+    of 0 disables caching.
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "FLIGHT_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return getattr(settings, "FLIGHT_CACHE_TIMEOUT", 300)
+
+    @property
+    def enabled(self):
+        return self.timeout != 0
+
+    def _incr(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # Start from the clock, so a counter evicted from the cache
+            # never returns to a version some stale entry was stored under.
+            self.cache.add(key, time.time_ns(), timeout=None)
+
+    def _versions(self, keys):
+        versions = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in versions]
+        for key in missing:
+            self.cache.add(key, time.time_ns(), timeout=None)
+        if missing:
+            versions.update(self.cache.get_many(missing))
+        return versions
+
+    def _count(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 1, timeout=None)
+
+    def _bump(self, route_ids, catalog):
+        for route_id in route_ids:
+            self._incr(ROUTE_VERSION_KEY.format(route_id))
+        if catalog:
+            self._incr(CATALOG_VERSION_KEY)
+
+    def invalidate(self, route_ids=(), catalog=False):
+        """Bump versions now and once more after commit
+
+        The second bump drops entries that concurrent requests may have
+        filled with data read before the transaction committed.
+        """
+        route_ids = {route_id for route_id in route_ids if route_id}
+        if not self.enabled or not (route_ids or catalog):
+            return
+        self._bump(route_ids, catalog)
+        transaction.on_commit(lambda: self._bump(route_ids, catalog))
+
+    def forget_flight(self, flight_id):
+        self.cache.delete(FLIGHT_ROUTE_KEY.format(flight_id))
+
+    def get_versioned(self, namespace, *parts):
+        """Look up an entry validated by versions of routes it contains
+
+        Returns the key to store a missing entry under and cached data.
+        """
+        if not self.enabled:
+            return None, None
+
+        digest = hashlib.md5(
+            repr(parts).encode(), usedforsecurity=False
+        ).hexdigest()
+        catalog = self._versions([CATALOG_VERSION_KEY])[CATALOG_VERSION_KEY]
+        key = VERSIONED_KEY.format(namespace, catalog, digest)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            data, route_versions = entry
+            if self._versions(list(route_versions)) == route_versions:
+                self._count(HITS_KEY)
+                return key, data
+
+        self._count(MISSES_KEY)
+        return key, None
+
+    def set_versioned(self, key, data, route_ids):
+        if key is None:
+            return
+        route_versions = self._versions(
+            [ROUTE_VERSION_KEY.format(route_id) for route_id in route_ids]
+        )
+        self.cache.set(key, (data, route_versions), self.timeout)
+
+    def get_list(self, request):
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        return self.get_versioned(
+            "list", request.get_host(), request.path, params
+        )
+
+    set_list = set_versioned
+
+    def _detail_key(self, flight_id, route_id):
+        route_key = ROUTE_VERSION_KEY.format(route_id)
+        versions = self._versions([CATALOG_VERSION_KEY, route_key])
+        return DETAIL_KEY.format(
+            flight_id, versions[CATALOG_VERSION_KEY], versions[route_key]
+        )
+
+    def get_detail(self, flight_id):
+        if not self.enabled:
+            return None
+
+        route_id = self.cache.get(FLIGHT_ROUTE_KEY.format(flight_id))
+        if route_id is not None:
+            data = self.cache.get(self._detail_key(flight_id, route_id))
+            if data is not None:
+                self._count(HITS_KEY)
+                return data
+
+        self._count(MISSES_KEY)
+        return None
+
+    def set_detail(self, flight_id, route_id, data):
+        if not self.enabled:
+            return
+        self.cache.set(
+            FLIGHT_ROUTE_KEY.format(flight_id), route_id, self.timeout
+        )
+        self.cache.set(
+            self._detail_key(flight_id, route_id), data, self.timeout
+        )
+
+    def stats(self):
+        counters = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits = counters.get(HITS_KEY, 0)
+        misses = counters.get(MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+flight_cache = FlightCache()
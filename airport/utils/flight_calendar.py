@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from django.db.models import Count, F, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from rest_framework import serializers
+
+from airport.models import Flight
+from airport.utils.date_windows import in_range, start_of_day
+from airport.utils.flight_cache import flight_cache
+from airport.utils.search import get_match_lookup
+
+
+def parse_month(value):
+    try:
+        month = datetime.strptime(value, "%Y-%m").date()
+        next_month = month.replace(
+            year=month.year + month.month // 12, month=month.month % 12 + 1
+        )
+    except ValueError:
+        raise serializers.ValidationError(
+            {"month": "Month has wrong format. Use YYYY-MM."}
+        )
+    return (
+        in_range(start_of_day(month), "month"),
+        in_range(start_of_day(next_month), "month"),
+    )
+
+
+def build_calendar(query_params):
+    """Per-day flight counts and minimum free seats for a city pair
+
+    Flights are grouped by route and local departure day in one query,
+    routes are folded together here, so the result can be cached with
+    versions of the routes it covers.
+    """
+    errors = {
+        name: "This parameter is required."
+        for name in ("from", "to", "month")
+        if not query_params.get(name)
+    }
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    lookup = get_match_lookup(query_params)
+    month_start, month_end = parse_month(query_params["month"])
+    key, days = flight_cache.get_versioned(
+        "calendar",
+        query_params["from"].casefold(),
+        query_params["to"].casefold(),
+        month_start,
+        lookup,
+    )
+    if days is not None:
+        return days
+
+    city_filters = {
+        f"route__source__closest_big_city__{lookup}": query_params["from"],
+        f"route__destination__closest_big_city__{lookup}": query_params["to"],
+    }
+    rows = (
+        Flight.objects
+        .filter(
+            departure_time__gte=max(month_start, timezone.now()),
+            departure_time__lt=month_end,
+            **city_filters
+        )
+        .values("route_id", date=TruncDate("departure_time"))
+        .annotate(
+            flights=Count("id"),
+            min_seats_available=Min(
+                F("airplane__rows") * F("airplane__seats_in_row")
+                - F("seats_sold")
+            ),
+        )
+        .order_by()
+    )
+
+    by_date = {}
+    route_ids = set()
+    for row in rows:
+        route_ids.add(row["route_id"])
+        day = by_date.setdefault(
+            row["date"],
+            {"date": row["date"], "flights": 0, "min_seats_available": None},
+        )
+        day["flights"] += row["flights"]
+        if day["min_seats_available"] is None:
+            day["min_seats_available"] = row["min_seats_available"]
+        else:
+            day["min_seats_available"] = min(
+                day["min_seats_available"], row["min_seats_available"]
+            )
+
+    days = [by_date[date] for date in sorted(by_date)]
+    flight_cache.set_versioned(key, days, route_ids)
+    return days
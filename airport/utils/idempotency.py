@@ -0,0 +1,92 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+STORED_HEADERS = ("Location", "Preference-Applied")
+KEY_REUSED_MESSAGE = (
+    "This Idempotency-Key was already used with a different request body."
+)
+
+
+def idempotency_expiry():
+    """Keys created before this moment are expired"""
+    return timezone.now() - timedelta(
+        hours=getattr(settings, "IDEMPOTENCY_KEY_TTL_HOURS", 24)
+    )
+
+
+def request_hash(request):
+    return hashlib.sha256(
+        json.dumps(request.data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def replay(record, fingerprint):
+    if record.request_hash != fingerprint:
+        return Response(
+            {"detail": KEY_REUSED_MESSAGE},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        record.response,
+        status=record.status_code,
+        headers={**(record.headers or {}), REPLAYED_HEADER: "true"},
+    )
+
+
+def idempotent_create(request, create):
+    """Run create once per (user, Idempotency-Key) and replay its response
+
+    The key is claimed before create runs and in the same transaction, so
+    a concurrent retry waits for the first attempt and replays its result.
+    Only successful responses are stored, failed attempts release the key.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return create()
+    max_length = IdempotencyKey._meta.get_field("key").max_length
+    if not 0 < len(key) <= max_length:
+        raise serializers.ValidationError(
+            {IDEMPOTENCY_HEADER: f"Must be 1 to {max_length} characters long."}
+        )
+
+    fingerprint = request_hash(request)
+    records = IdempotencyKey.objects.filter(user=request.user, key=key)
+    expiry = idempotency_expiry()
+    record = records.filter(created_at__gt=expiry).first()
+    if record is not None:
+        return replay(record, fingerprint)
+
+    with transaction.atomic():
+        records.filter(created_at__lte=expiry).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, request_hash=fingerprint
+                )
+        except IntegrityError:
+            return replay(records.get(), fingerprint)
+
+        response = create()
+        if not status.is_success(response.status_code):
+            transaction.set_rollback(True)
+            return response
+        record.status_code = response.status_code
+        record.response = response.data
+        record.headers = {
+            name: response[name]
+            for name in STORED_HEADERS
+            if response.has_header(name)
+        }
+        record.save(update_fields=["status_code", "response", "headers"])
+        return response
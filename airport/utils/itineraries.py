@@ -0,0 +1,279 @@
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from airport.models import Flight
+from airport.utils.date_windows import day_range, parse_date, parse_int
+
+Leg = namedtuple(
+    "Leg",
+    (
+        "id",
+        "route",
+        "source_city",
+        "destination_city",
+        "departure_time",
+        "arrival_time",
+    ),
+)
+
+LEG_FIELDS = (
+    "id",
+    "route__source__name",
+    "route__destination__name",
+    "route__source__closest_big_city",
+    "route__destination__closest_big_city",
+    "departure_time",
+    "arrival_time",
+)
+
+
+def city_key(city):
+    return city.strip().casefold()
+
+
+def leg_from_row(row):
+    (
+        flight_id,
+        source_name,
+        destination_name,
+        source_city,
+        destination_city,
+        departure_time,
+        arrival_time,
+    ) = row
+    return Leg(
+        flight_id,
+        f"{source_name}-{destination_name}",
+        city_key(source_city),
+        city_key(destination_city),
+        departure_time,
+        arrival_time,
+    )
+
+
+class FlightGraph:
+    """Time-expanded graph of upcoming flights, grouped by departure city
+
+    Departures of every city are kept sorted by departure time, so the
+    connections that fit into a layover window are found with bisect.
+    The graph is built lazily, patched by Flight signals and rebuilt from
+    scratch when routes or airports change or it gets older than
+    ITINERARY_GRAPH_TTL seconds (which bounds staleness across processes).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._legs = None
+        self._departures = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._legs = None
+
+    def _ensure_built(self):
+        ttl = getattr(settings, "ITINERARY_GRAPH_TTL", 300)
+        if self._legs is not None and time.monotonic() - self._built_at < ttl:
+            return
+
+        rows = (
+            Flight.objects
+            .filter(departure_time__gt=timezone.now())
+            .values_list(*LEG_FIELDS)
+        )
+        self._legs = {}
+        self._departures = defaultdict(list)
+        for row in rows.iterator(chunk_size=2000):
+            self._add(leg_from_row(row))
+        self._built_at = time.monotonic()
+
+    def _add(self, leg):
+        self._legs[leg.id] = leg
+        bisect.insort(
+            self._departures[leg.source_city], (leg.departure_time, leg.id)
+        )
+
+    def _remove(self, flight_id):
+        leg = self._legs.pop(flight_id, None)
+        if leg is not None:
+            departures = self._departures[leg.source_city]
+            departures.remove((leg.departure_time, leg.id))
+
+    def refresh_flight(self, flight_id):
+        with self._lock:
+            if self._legs is None:
+                return
+            self._remove(flight_id)
+            row = (
+                Flight.objects
+                .filter(pk=flight_id, departure_time__gt=timezone.now())
+                .values_list(*LEG_FIELDS)
+                .first()
+            )
+            if row is not None:
+                self._add(leg_from_row(row))
+
+    def remove_flight(self, flight_id):
+        with self._lock:
+            if self._legs is not None:
+                self._remove(flight_id)
+
+    def _departures_between(self, city, start, end):
+        departures = self._departures.get(city, ())
+        index = bisect.bisect_left(departures, (start, 0))
+        while index < len(departures) and departures[index][0] < end:
+            yield self._legs[departures[index][1]]
+            index += 1
+
+    def search(self, params, excluded=()):
+        """Return the limit shortest itineraries as lists of legs
+
+        Runs a depth-first search bounded by max_legs and by the layover
+        window, never visiting a city twice within one itinerary. Only the
+        limit best itineraries are kept, and a path is abandoned once it
+        takes longer than the worst of them. Flights in excluded are
+        skipped.
+        """
+        with self._lock:
+            self._ensure_built()
+            origin = city_key(params["from"])
+            destination = city_key(params["to"])
+            min_layover = params["min_layover"]
+            max_layover = params["max_layover"]
+            limit = params["limit"]
+            best = []
+            found = itertools.count()
+
+            def extend(path, visited):
+                last = path[-1]
+                duration = last.arrival_time - path[0].departure_time
+                if len(best) == limit and duration >= -best[0][0]:
+                    return
+                if last.destination_city == destination:
+                    # Max-heap on duration, ties keep the earlier found
+                    item = (-duration, -next(found), path)
+                    if len(best) < limit:
+                        heapq.heappush(best, item)
+                    else:
+                        heapq.heapreplace(best, item)
+                    return
+                if len(path) == params["max_legs"]:
+                    return
+                for leg in self._departures_between(
+                    last.destination_city,
+                    last.arrival_time + min_layover,
+                    last.arrival_time + max_layover,
+                ):
+                    if (
+                        leg.destination_city not in visited
+                        and leg.id not in excluded
+                    ):
+                        visited.add(leg.destination_city)
+                        extend(path + [leg], visited)
+                        visited.discard(leg.destination_city)
+
+            for first_leg in self._departures_between(
+                origin,
+                max(params["departure_from"], timezone.now()),
+                params["departure_to"],
+            ):
+                if first_leg.id not in excluded:
+                    extend([first_leg], {origin, first_leg.destination_city})
+
+            return [path for _, _, path in sorted(best, reverse=True)]
+
+
+flight_graph = FlightGraph()
+
+
+def parse_search_params(query_params):
+    errors = {
+        name: "This parameter is required."
+        for name in ("from", "to", "date")
+        if not query_params.get(name)
+    }
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    departure_from, departure_to = day_range(
+        parse_date(query_params["date"], "date")
+    )
+    min_layover = parse_int(query_params, "min_layover", 45, 0, 24 * 60)
+    max_layover = parse_int(query_params, "max_layover", 720, 0, 48 * 60)
+    if max_layover < min_layover:
+        raise serializers.ValidationError(
+            {"max_layover": "Must not be less than min_layover."}
+        )
+    return {
+        "from": query_params["from"],
+        "to": query_params["to"],
+        "departure_from": departure_from,
+        "departure_to": departure_to,
+        "max_legs": parse_int(query_params, "max_legs", 2, 1, 3),
+        "min_layover": timedelta(minutes=min_layover),
+        "max_layover": timedelta(minutes=max_layover),
+        "limit": parse_int(query_params, "limit", 5, 1, 20),
+    }
+
+
+def seats_available(flight_ids):
+    seats = dict.fromkeys(flight_ids, 0)
+    seats.update(
+        Flight.objects
+        .filter(id__in=flight_ids)
+        .annotate(
+            tickets_available=(
+                F("airplane__rows") * F("airplane__seats_in_row")
+                - F("seats_sold")
+            )
+        )
+        .values_list("id", "tickets_available")
+    )
+    return seats
+
+
+def find_itineraries(query_params):
+    """Top itineraries by total duration that still have free seats
+
+    Sold out flights are only known after a search, so the search is
+    repeated without them until every itinerary found has seats. Each
+    round checks at most limit * max_legs flights.
+    """
+    params = parse_search_params(query_params)
+    seats = {}
+    sold_out = set()
+    while True:
+        itineraries = flight_graph.search(params, sold_out)
+        unknown = {
+            leg.id for legs in itineraries for leg in legs
+        } - seats.keys()
+        if not unknown:
+            break
+        seats.update(seats_available(unknown))
+        found_sold_out = {
+            flight_id for flight_id in unknown if seats[flight_id] <= 0
+        }
+        if not found_sold_out:
+            break
+        sold_out |= found_sold_out
+
+    return [
+        {
+            "departure_time": legs[0].departure_time,
+            "arrival_time": legs[-1].arrival_time,
+            "duration": legs[-1].arrival_time - legs[0].departure_time,
+            "seats_available": min(seats[leg.id] for leg in legs),
+            "legs": [leg._asdict() for leg in legs],
+        }
+        for legs in itineraries
+    ]
@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from airport.models import Flight, Order, Ticket
+
+ORDER_FIELDS = ("id", "created_at")
+TICKET_FIELDS = ("order_id", "id", "row", "seat", "flight_id")
+FLIGHT_FIELDS = (
+    "id",
+    "route__source__name",
+    "route__destination__name",
+    "departure_time",
+    "arrival_time",
+    "airplane__name",
+)
+
+
+def order_rows(user):
+    """Orders of a user as plain dicts, ready to be paginated"""
+    return Order.objects.filter(user=user).values(*ORDER_FIELDS)
+
+
+def serialize_orders(orders):
+    """Render orders like OrderListSerializer from a few column queries
+
+    Takes dicts of order_rows, loads tickets of all orders in one query
+    and every flight they reference once, in another.
+    """
+    order_ids = [order["id"] for order in orders]
+    if not order_ids:
+        return []
+
+    datetime_field = serializers.DateTimeField()
+
+    tickets_by_order = defaultdict(list)
+    flight_ids = set()
+    for order_id, *ticket in (
+        Ticket.objects
+        .filter(order_id__in=order_ids)
+        .order_by("row", "seat", "id")
+        .values_list(*TICKET_FIELDS)
+    ):
+        tickets_by_order[order_id].append(ticket)
+        flight_ids.add(ticket[-1])
+
+    flights = {
+        flight_id: {
+            "route": f"{source}-{destination}",
+            "departure_time": datetime_field.to_representation(departure),
+            "arrival_time": datetime_field.to_representation(arrival),
+            "airplane_name": airplane_name,
+        }
+        for (
+            flight_id, source, destination, departure, arrival, airplane_name
+        ) in (
+            Flight.objects
+            .filter(id__in=flight_ids)
+            .order_by()
+            .values_list(*FLIGHT_FIELDS)
+        )
+    }
+
+    return [
+        {
+            "id": order["id"],
+            "created_at": datetime_field.to_representation(
+                order["created_at"]
+            ),
+            "tickets": [
+                {
+                    "id": ticket_id,
+                    "row": row,
+                    "seat": seat,
+                    "flight": flights[flight_id],
+                }
+                for ticket_id, row, seat, flight_id
+                in tickets_by_order[order["id"]]
+            ],
+        }
+        for order in orders
+    ]
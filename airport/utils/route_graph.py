@@ -0,0 +1,200 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+
+from airport.models import Airport, Route
+from airport.utils.date_windows import parse_int
+
+MAX_LEGS = 10
+
+
+class RouteGraph:
+    """Adjacency map of direct routes weighted by distance
+
+    Answers shortest-path and reachability queries with Dijkstra over
+    (airport, legs) states, so the number of legs can be bounded. Route
+    networks are sparse, an adjacency map keeps memory linear in the
+    number of routes where a distance matrix would be quadratic in the
+    number of airports. Patched by Route and Airport signals and rebuilt
+    after ROUTE_GRAPH_TTL seconds, which bounds staleness across
+    processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._edges = None
+        self._airports = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._edges = None
+
+    def _ensure_built(self):
+        ttl = getattr(settings, "ROUTE_GRAPH_TTL", 300)
+        if self._edges is not None and time.monotonic() - self._built_at < ttl:
+            return
+
+        self._airports = {
+            airport["id"]: airport
+            for airport in Airport.objects.values(
+                "id", "name", "closest_big_city"
+            )
+        }
+        self._edges = defaultdict(dict)
+        for route_id, source_id, destination_id, distance in (
+            Route.objects
+            .values_list("id", "source_id", "destination_id", "distance")
+            .iterator(chunk_size=2000)
+        ):
+            self._edges[source_id][destination_id] = (distance, route_id)
+        self._built_at = time.monotonic()
+
+    def refresh_route(self, route_id, previous_airport_ids=()):
+        with self._lock:
+            if self._edges is None:
+                return
+            if previous_airport_ids:
+                source_id, destination_id = previous_airport_ids
+                self._edges[source_id].pop(destination_id, None)
+            route = (
+                Route.objects
+                .filter(pk=route_id)
+                .values_list("source_id", "destination_id", "distance")
+                .first()
+            )
+            if route is not None:
+                source_id, destination_id, distance = route
+                self._edges[source_id][destination_id] = (distance, route_id)
+
+    def remove_route(self, source_id, destination_id):
+        with self._lock:
+            if self._edges is not None:
+                self._edges[source_id].pop(destination_id, None)
+
+    def refresh_airport(self, airport_id):
+        with self._lock:
+            if self._edges is None:
+                return
+            airport = (
+                Airport.objects
+                .filter(pk=airport_id)
+                .values("id", "name", "closest_big_city")
+                .first()
+            )
+            if airport is not None:
+                self._airports[airport_id] = airport
+
+    def remove_airport(self, airport_id):
+        with self._lock:
+            if self._edges is None:
+                return
+            self._airports.pop(airport_id, None)
+            self._edges.pop(airport_id, None)
+            for destinations in self._edges.values():
+                destinations.pop(airport_id, None)
+
+    def _dijkstra(self, source_id, max_legs, max_distance=None, target=None):
+        """Yield (distance, legs, airport id, path) in distance order"""
+        queue = [(0, 0, source_id, ())]
+        fewest_legs = {}
+        while queue:
+            distance, legs, airport_id, path = heapq.heappop(queue)
+            # States are popped by distance, a later one is only worth
+            # expanding when it reached the airport with fewer legs.
+            if fewest_legs.get(airport_id, max_legs + 1) <= legs:
+                continue
+            fewest_legs[airport_id] = legs
+            yield distance, legs, airport_id, path
+            if airport_id == target or legs == max_legs:
+                continue
+            for destination_id, (length, route_id) in self._edges.get(
+                airport_id, {}
+            ).items():
+                total = distance + length
+                if max_distance is not None and total > max_distance:
+                    continue
+                heapq.heappush(
+                    queue,
+                    (
+                        total,
+                        legs + 1,
+                        destination_id,
+                        path + ((route_id, destination_id),),
+                    ),
+                )
+
+    def _check_airports(self, **airport_ids):
+        errors = {
+            name: "Airport does not exist."
+            for name, airport_id in airport_ids.items()
+            if airport_id not in self._airports
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+
+    def shortest_path(self, source_id, destination_id, max_legs=MAX_LEGS):
+        with self._lock:
+            self._ensure_built()
+            self._check_airports(
+                source=source_id, destination=destination_id
+            )
+            for distance, _, airport_id, path in self._dijkstra(
+                source_id, max_legs, target=destination_id
+            ):
+                if airport_id == destination_id:
+                    return {
+                        "distance": distance,
+                        "airports": [self._airports[source_id]] + [
+                            self._airports[stop] for _, stop in path
+                        ],
+                        "routes": [route_id for route_id, _ in path],
+                    }
+            return None
+
+    def reachable(self, source_id, max_distance, max_legs=MAX_LEGS):
+        """Airports within max_distance with the shortest way to each"""
+        with self._lock:
+            self._ensure_built()
+            self._check_airports(source=source_id)
+            results = {}
+            for distance, legs, airport_id, _ in self._dijkstra(
+                source_id, max_legs, max_distance=max_distance
+            ):
+                if airport_id != source_id and airport_id not in results:
+                    results[airport_id] = {
+                        "airport": self._airports[airport_id],
+                        "distance": distance,
+                        "legs": legs,
+                    }
+            return list(results.values())
+
+
+route_graph = RouteGraph()
+
+
+def find_route_paths(query_params):
+    """Shortest path with ?destination=, reachable airports otherwise"""
+    if not query_params.get("source"):
+        raise serializers.ValidationError(
+            {"source": "This parameter is required."}
+        )
+    source_id = parse_int(query_params, "source", None, 1, 2 ** 63 - 1)
+    max_legs = parse_int(query_params, "max_legs", MAX_LEGS, 1, MAX_LEGS)
+
+    if query_params.get("destination"):
+        destination_id = parse_int(
+            query_params, "destination", None, 1, 2 ** 63 - 1
+        )
+        return route_graph.shortest_path(source_id, destination_id, max_legs)
+
+    if not query_params.get("max_distance"):
+        raise serializers.ValidationError(
+            {"destination": "Either destination or max_distance is required."}
+        )
+    max_distance = parse_int(query_params, "max_distance", None, 0, 10 ** 9)
+    return route_graph.reachable(source_id, max_distance, max_legs)
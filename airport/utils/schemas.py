@@ -1,10 +1,59 @@
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 
+from airport.serializers.route_serializers import RoutePathSerializer
 
-def route_list_schema():
+
+def cursor_pagination_parameters():
+    return [
+        OpenApiParameter(
+            "pagination",
+            type=OpenApiTypes.STR,
+            enum=["cursor"],
+            description="Use cursor pagination without total count "
+                        "(ex. ?pagination=cursor)"
+        ),
+        OpenApiParameter(
+            "cursor",
+            type=OpenApiTypes.STR,
+            description="Cursor from next/previous link of cursor pagination"
+        ),
+    ]
+
+
+def match_parameter():
+    return OpenApiParameter(
+        "match",
+        type=OpenApiTypes.STR,
+        enum=["contains", "prefix", "exact"],
+        description="Case-insensitive matching of text filters, "
+                    "contains by default (ex. ?match=prefix)"
+    )
+
+
+def airport_autocomplete_schema():
     return extend_schema(
         parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Prefix of any word of airport name or its "
+                            "closest big city, airports with most routes "
+                            "come first (ex. ?q=lon)"
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of airports, 1 to 50 (ex. ?limit=5)"
+            ),
+        ]
+    )
+
+
+def route_list_schema():
+    return extend_schema(
+        parameters=cursor_pagination_parameters() + [
             OpenApiParameter(
                 "source",
                 type=OpenApiTypes.STR,
@@ -14,14 +63,48 @@ def route_list_schema():
                 "destination",
                 type=OpenApiTypes.STR,
                 description="Filtering by destination (ex. ?destination=Paris)"
-            )
+            ),
+            match_parameter()
         ]
     )
 
 
-def flight_list_schema():
+def route_paths_schema():
     return extend_schema(
         parameters=[
+            OpenApiParameter(
+                "source",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Source airport id (ex. ?source=1)"
+            ),
+            OpenApiParameter(
+                "destination",
+                type=OpenApiTypes.INT,
+                description="Destination airport id, returns the shortest "
+                            "path by distance (ex. ?destination=7)"
+            ),
+            OpenApiParameter(
+                "max_distance",
+                type=OpenApiTypes.INT,
+                description="Without destination, returns every airport "
+                            "reachable within this distance "
+                            "(ex. ?max_distance=1500)"
+            ),
+            OpenApiParameter(
+                "max_legs",
+                type=OpenApiTypes.INT,
+                description="Maximum number of routes, 1 to 10 "
+                            "(ex. ?max_legs=1 for direct routes only)"
+            ),
+        ],
+        responses={200: RoutePathSerializer},
+    )
+
+
+def flight_list_schema():
+    return extend_schema(
+        parameters=cursor_pagination_parameters() + [
             OpenApiParameter(
                 "from",
                 type=OpenApiTypes.STR,
@@ -32,6 +115,7 @@ def flight_list_schema():
                 type=OpenApiTypes.STR,
                 description="Filtering by destination (ex. ?to=Paris)"
             ),
+            match_parameter(),
             OpenApiParameter(
                 "departure_date",
                 type=OpenApiTypes.DATE,
@@ -43,6 +127,182 @@ def flight_list_schema():
                 type=OpenApiTypes.DATE,
                 description="Filtering by arrival date "
                             "(ex. ?arrival_date=2024-03-26)"
+            ),
+            OpenApiParameter(
+                "flex_days",
+                type=OpenApiTypes.INT,
+                description="Widen departure_date and arrival_date filters "
+                            "by N days in both directions, 0-7 "
+                            "(ex. ?departure_date=2024-03-25&flex_days=2)"
+            ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.DATETIME,
+                description="Departing at or after date or datetime "
+                            "(ex. ?departure_from=2024-03-25T10:00)"
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.DATETIME,
+                description="Departing before datetime or until the end "
+                            "of date (ex. ?departure_to=2024-03-27)"
+            ),
+            OpenApiParameter(
+                "arrival_from",
+                type=OpenApiTypes.DATETIME,
+                description="Arriving at or after date or datetime "
+                            "(ex. ?arrival_from=2024-03-25T10:00)"
+            ),
+            OpenApiParameter(
+                "arrival_to",
+                type=OpenApiTypes.DATETIME,
+                description="Arriving before datetime or until the end "
+                            "of date (ex. ?arrival_to=2024-03-27)"
+            )
+        ]
+    )
+
+
+def order_list_schema():
+    return extend_schema(parameters=cursor_pagination_parameters())
+
+
+def export_schema():
+    return extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "output",
+                type=OpenApiTypes.STR,
+                enum=["csv", "ndjson"],
+                description="Export format (ex. ?output=ndjson)"
+            ),
+        ] + [
+            OpenApiParameter(
+                f"{prefix}_{bound}",
+                type=OpenApiTypes.STR,
+                description=f"Keep rows with {prefix} time at or after "
+                            f"(from) or before the end of (to) a date or "
+                            f"datetime, {prefix} windows apply to "
+                            f"{exports} exports (ex. ?{prefix}_from="
+                            f"2024-05-01)"
+            )
+            for prefix, exports in (
+                ("departure", "flights and tickets"),
+                ("arrival", "flights"),
+                ("created", "orders and tickets"),
+            )
+            for bound in ("from", "to")
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+    )
+
+
+def cancel_schema(request=None):
+    return extend_schema(
+        request=request,
+        responses={200: OpenApiTypes.OBJECT},
+        description="Release seats of cancelled tickets, responds with "
+                    'their count (ex. {"cancelled": 2})'
+    )
+
+
+def order_create_schema():
+    return extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Unique key of the order attempt, retries with "
+                            "the same key replay the first successful "
+                            "response instead of creating another order"
             )
         ]
     )
+
+
+def flight_seatmap_schema():
+    return extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=["base64", "rle"],
+                description="Seat map encoding: row-major bitmap in base64 "
+                            "or per-row run lengths starting with free "
+                            "seats (ex. ?encoding=rle)"
+            )
+        ]
+    )
+
+
+def flight_itineraries_schema():
+    return extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Departure city (ex. ?from=Rome)"
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Arrival city (ex. ?to=Paris)"
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                required=True,
+                description="Departure date of the first leg "
+                            "(ex. ?date=2024-03-25)"
+            ),
+            OpenApiParameter(
+                "max_legs",
+                type=OpenApiTypes.INT,
+                description="Maximum number of flights, 1-3 (default 2)"
+            ),
+            OpenApiParameter(
+                "min_layover",
+                type=OpenApiTypes.INT,
+                description="Minimum layover in minutes (default 45)"
+            ),
+            OpenApiParameter(
+                "max_layover",
+                type=OpenApiTypes.INT,
+                description="Maximum layover in minutes (default 720)"
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of itineraries, 1-20 (default 5)"
+            ),
+        ]
+    )
+
+
+def flight_calendar_schema():
+    return extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Departure city (ex. ?from=Rome)"
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Arrival city (ex. ?to=Paris)"
+            ),
+            OpenApiParameter(
+                "month",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Month of departure (ex. ?month=2024-03)"
+            ),
+            match_parameter(),
+        ]
+    )
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+MATCH_LOOKUPS = {
+    "contains": "icontains",
+    "prefix": "istartswith",
+    "exact": "iexact",
+}
+SEARCH_INDEXES = (
+    "airport_name_trgm",
+    "airport_city_trgm",
+    "airport_name_prefix",
+    "airport_city_prefix",
+)
+
+
+def get_match_lookup(query_params):
+    """Resolve ?match= into a case-insensitive lookup, icontains by default
+
+    On PostgreSQL every lookup is served by the UPPER(...) indexes created
+    in migrations: trigram GIN for contains, text_pattern_ops B-tree for
+    prefix and exact matches.
+    """
+    match = query_params.get("match", "contains")
+    if match not in MATCH_LOOKUPS:
+        matches = ", ".join(MATCH_LOOKUPS)
+        raise serializers.ValidationError(
+            {"match": f"Match must be one of: {matches}"}
+        )
+    return MATCH_LOOKUPS[match]
@@ -0,0 +1,93 @@
+import base64
+import hashlib
+
+from django.db.models import Count, F, Max, Sum
+from django.utils.http import quote_etag
+
+from airport.models import Ticket
+
+ENCODINGS = ("base64", "rle")
+
+
+def build_seat_bitmap(flight):
+    """Build a row-major bitmap of taken seats with a single query
+
+    Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1),
+    most significant bit first within every byte. Tickets for seats the
+    airplane no longer has, after it was made smaller, are left out and
+    counted separately.
+    """
+    rows = flight.airplane.rows
+    seats_in_row = flight.airplane.seats_in_row
+    bitmap = bytearray((flight.airplane.capacity + 7) // 8)
+    outside_layout = 0
+    taken_seats = Ticket.objects.filter(flight=flight).order_by().values_list(
+        "row", "seat"
+    )
+    for row, seat in taken_seats:
+        if not (1 <= row <= rows and 1 <= seat <= seats_in_row):
+            outside_layout += 1
+            continue
+        index = (row - 1) * seats_in_row + (seat - 1)
+        bitmap[index // 8] |= 0x80 >> (index % 8)
+    return bitmap, outside_layout
+
+
+def encode_base64(bitmap, rows, seats_in_row):
+    return base64.b64encode(bytes(bitmap)).decode("ascii")
+
+
+def encode_rle(bitmap, rows, seats_in_row):
+    """Encode every row as alternating run lengths, starting with free"""
+    encoded_rows = []
+    for row in range(rows):
+        runs = []
+        current, length = False, 0
+        for seat in range(seats_in_row):
+            index = row * seats_in_row + seat
+            taken = bool(bitmap[index // 8] & (0x80 >> (index % 8)))
+            if taken == current:
+                length += 1
+            else:
+                runs.append(length)
+                current, length = taken, 1
+        runs.append(length)
+        encoded_rows.append(runs)
+    return encoded_rows
+
+
+def seat_map_etag(flight, encoding):
+    """ETag of the seat map from one aggregate over the flight's tickets
+
+    Ticket ids only grow, so any sale or cancellation changes the count or
+    the highest id. The seat positions cover tickets moved in place. A
+    matching If-None-Match is answered without building the bitmap.
+    """
+    airplane = flight.airplane
+    tickets = Ticket.objects.filter(flight=flight).order_by().aggregate(
+        count=Count("id"),
+        last_id=Max("id"),
+        positions=Sum(F("row") * airplane.seats_in_row + F("seat")),
+    )
+    digest = hashlib.md5(
+        f"{flight.id}:{airplane.rows}:{airplane.seats_in_row}:{encoding}:"
+        f"{tickets['count']}:{tickets['last_id']}:{tickets['positions']}"
+        .encode(),
+        usedforsecurity=False,
+    )
+    return quote_etag(digest.hexdigest())
+
+
+def build_seat_map(flight, encoding):
+    bitmap, outside_layout = build_seat_bitmap(flight)
+    encoder = encode_rle if encoding == "rle" else encode_base64
+    rows, seats_in_row = flight.airplane.rows, flight.airplane.seats_in_row
+    return {
+        "flight": flight.id,
+        "rows": rows,
+        "seats_in_row": seats_in_row,
+        "seats_taken": sum(bin(byte).count("1") for byte in bitmap),
+        "seats_outside_layout": outside_layout,
+        "encoding": encoding,
+        "seats": encoder(bitmap, rows, seats_in_row),
+    }
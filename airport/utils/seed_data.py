@@ -0,0 +1,162 @@
+import hashlib
+import json
+import re
+from collections import defaultdict
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from airport.models import SeedDataLoad
+from airport.utils.flight_cache import flight_cache
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"\s*")
+
+
+def fixture_checksum(path):
+    with open(path, "rb") as fixture:
+        return hashlib.file_digest(fixture, "sha256").hexdigest()
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Yield items of a top-level JSON array while reading it in chunks
+
+    Only the item being decoded and the rest of the current chunk are
+    kept in memory, whatever the size of the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer, index = "", 0
+    expected = "["
+
+    while True:
+        index = WHITESPACE.match(buffer, index).end()
+        if index == len(buffer):
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise ValueError("Fixture ended before its closing bracket")
+            buffer, index = buffer[index:] + chunk, 0
+            continue
+
+        char = buffer[index]
+        if expected == "[":
+            if char != "[":
+                raise ValueError("Fixture must be a JSON array")
+            expected, index = "first", index + 1
+        elif char == "]" and expected in ("first", ","):
+            return
+        elif expected == ",":
+            if char != ",":
+                raise ValueError(f"Expected ',' at {buffer[index:][:20]!r}")
+            expected, index = "item", index + 1
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                end = None
+            # A number or an unfinished item may go on in the next chunk
+            if end is None or end == len(buffer):
+                chunk = stream.read(chunk_size)
+                if chunk:
+                    buffer, index = buffer[index:] + chunk, 0
+                    continue
+                if end is None:
+                    decoder.raw_decode(buffer, index)
+            yield item
+            expected, index = ",", end
+
+
+def insert_objects(model, objects, batch_size):
+    """Insert objects, replacing rows with the same primary key"""
+    fields = [
+        field.name
+        for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    with_pk = [obj for obj in objects if obj.pk is not None]
+    if with_pk and fields:
+        model.objects.bulk_create(
+            with_pk,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=fields,
+        )
+    elif with_pk:
+        model.objects.bulk_create(
+            with_pk, batch_size=batch_size, ignore_conflicts=True
+        )
+    model.objects.bulk_create(
+        [obj for obj in objects if obj.pk is None], batch_size=batch_size
+    )
+
+
+def set_relations(model, relations, batch_size):
+    """Replace many-to-many links of loaded objects, like loaddata does"""
+    for field_name, links in relations.items():
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        through.objects.filter(
+            **{f"{source}__in": [obj.pk for obj, _ in links]}
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(**{f"{source}_id": obj.pk, f"{target}_id": related})
+                for obj, related_pks in links
+                for related in related_pks
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+
+def load_seed_data(path, batch_size=1000, force=False):
+    """Bulk load a JSON fixture, unless this content is already loaded
+
+    Objects are deserialized one at a time from the stream, grouped by
+    model and inserted with bulk_create in dependency order, without
+    save() or signals. Returns the number of loaded objects, or None
+    when the checksum matches an earlier load.
+    """
+    checksum = fixture_checksum(path)
+    if not force and SeedDataLoad.objects.filter(checksum=checksum).exists():
+        return None
+
+    objects = defaultdict(list)
+    relations = defaultdict(lambda: defaultdict(list))
+    with open(path, encoding="utf-8") as fixture:
+        for deserialized in serializers.deserialize(
+            "python", iter_json_array(fixture)
+        ):
+            obj = deserialized.object
+            objects[type(obj)].append(obj)
+            for field_name, related_pks in deserialized.m2m_data.items():
+                relations[type(obj)][field_name].append((obj, related_pks))
+
+    app_list = defaultdict(list)
+    for model in objects:
+        app_list[apps.get_app_config(model._meta.app_label)].append(model)
+    models = serializers.sort_dependencies(app_list.items())
+
+    with transaction.atomic():
+        for model in models:
+            insert_objects(model, objects[model], batch_size)
+        for model in models:
+            set_relations(model, relations[model], batch_size)
+
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+        count = sum(len(model_objects) for model_objects in objects.values())
+        SeedDataLoad.objects.update_or_create(
+            checksum=checksum,
+            defaults={"fixture": str(path)[-255:], "objects_count": count},
+        )
+        flight_cache.invalidate(catalog=True)
+    return count
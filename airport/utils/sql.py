@@ -0,0 +1,15 @@
+import re
+
+NORMALIZATIONS = (
+    (re.compile(r"IN \((%s(, )?)+\)"), "IN (...)"),
+    (re.compile(r"VALUES (\((%s(, )?)+\)(, )?)+"), "VALUES (...)"),
+    (re.compile(r"(LIMIT|OFFSET) \d+"), r"\1 N"),
+    (re.compile(r'"s\d+_x\d+"'), '"savepoint"'),
+)
+
+
+def normalize_sql(sql):
+    """Collapse parts that differ only by the size of the data"""
+    for pattern, replacement in NORMALIZATIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql
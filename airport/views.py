@@ -1,9 +1,12 @@
-from datetime import datetime
-
-from django.db.models import F, Count
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags
 from drf_spectacular.utils import extend_schema_view
-from rest_framework import mixins, viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
 from airport.models import (
     Crew,
@@ -13,29 +16,82 @@ from airport.models import (
     Route,
     Flight,
     Order,
+    OrderRequest,
+    SeatHold,
+)
+from airport.booking import cancel_flight, cancel_order, hold_seats
+from airport.order_queue import prefers_async
+from airport.paginations import (
+    CursorPaginationMixin,
+    FlightCursorPagination,
+    OrderCursorPagination,
+    OrderPagination,
+    RouteCursorPagination,
 )
-from airport.paginations import OrderPagination
 from airport.serializers.airplane_serializers import AirplaneSerializer
 from airport.serializers.airplane_type_serializers import (
     AirplaneTypeSerializer
 )
-from airport.serializers.airport_serializers import AirportSerializer
+from airport.serializers.airport_serializers import (
+    AirportSerializer,
+    AirportAutocompleteSerializer,
+)
 from airport.serializers.crew_serializers import CrewSerializer
 from airport.serializers.flight_serializers import (
     FlightSerializer,
     FlightListSerializer,
-    FlightDetailSerializer
+    FlightDetailSerializer,
+    FlightSeatMapSerializer,
+    FlightCalendarDaySerializer,
+    ItinerarySerializer
 )
 from airport.serializers.order_serializers import (
     OrderSerializer,
     OrderListSerializer,
+    OrderCancelSerializer,
+)
+from airport.serializers.order_request_serializers import (
+    OrderRequestSerializer,
+)
+from airport.serializers.seat_hold_serializers import (
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
 )
 from airport.serializers.route_serializers import (
     RouteSerializer,
     RouteListSerializer,
-    RouteDetailSerializer
+    RouteDetailSerializer,
+    RoutePathSerializer,
+    RouteReachableSerializer,
+)
+from airport.utils.airport_index import autocomplete_airports
+from airport.utils.date_windows import filter_time_window
+from airport.utils.flight_cache import flight_cache
+from airport.utils.exports import EXPORTS, export_response
+from airport.utils.flight_calendar import build_calendar
+from airport.utils.idempotency import idempotent_create
+from airport.utils.order_list import order_rows, serialize_orders
+from airport.utils.route_graph import find_route_paths
+from airport.utils.itineraries import find_itineraries
+from airport.utils.schemas import (
+    airport_autocomplete_schema,
+    cancel_schema,
+    export_schema,
+    flight_calendar_schema,
+    flight_itineraries_schema,
+    flight_list_schema,
+    flight_seatmap_schema,
+    order_create_schema,
+    order_list_schema,
+    route_list_schema,
+    route_paths_schema
+)
+from airport.utils.search import get_match_lookup
+from airport.utils.seat_map import (
+    ENCODINGS,
+    build_seat_map,
+    seat_map_etag,
 )
-from airport.utils.schemas import flight_list_schema, route_list_schema
 
 
 class CrewViewSet(
@@ -67,6 +123,9 @@ class AirplaneViewSet(
     serializer_class = AirplaneSerializer
 
 
+@extend_schema_view(
+    autocomplete=airport_autocomplete_schema()
+)
 class AirportViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -76,11 +135,26 @@ class AirportViewSet(
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
 
+    def get_serializer_class(self):
+        if self.action == "autocomplete":
+            return AirportAutocompleteSerializer
+
+        return self.serializer_class
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        serializer = self.get_serializer(
+            autocomplete_airports(request.query_params), many=True
+        )
+        return Response(serializer.data)
+
 
 @extend_schema_view(
-    list=route_list_schema()
+    list=route_list_schema(),
+    paths=route_paths_schema()
 )
 class RouteViewSet(
+    CursorPaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -88,17 +162,22 @@ class RouteViewSet(
 ):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
+    cursor_pagination_class = RouteCursorPagination
 
     def get_queryset(self):
         queryset = self.queryset
 
         if self.action == "list":
+            lookup = get_match_lookup(self.request.query_params)
+
             if source := self.request.query_params.get("source"):
-                queryset = queryset.filter(source__name__icontains=source)
+                queryset = queryset.filter(
+                    **{f"source__name__{lookup}": source}
+                )
 
             if destination := self.request.query_params.get("destination"):
                 queryset = queryset.filter(
-                    destination__name__icontains=destination
+                    **{f"destination__name__{lookup}": destination}
                 )
 
         return queryset.distinct()
@@ -110,21 +189,46 @@ class RouteViewSet(
         if self.action == "retrieve":
             return RouteDetailSerializer
 
+        if self.action == "paths":
+            if self.request.query_params.get("destination"):
+                return RoutePathSerializer
+            return RouteReachableSerializer
+
         return self.serializer_class
 
+    @action(detail=False, methods=["get"])
+    def paths(self, request):
+        """Shortest path to destination or airports within max_distance"""
+        paths = find_route_paths(request.query_params)
+        if paths is None:
+            return Response(
+                {"detail": "No path between these airports."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        serializer = self.get_serializer(
+            paths, many=isinstance(paths, list)
+        )
+        return Response(serializer.data)
+
 
 @extend_schema_view(
-    list=flight_list_schema()
+    list=flight_list_schema(),
+    seatmap=flight_seatmap_schema(),
+    itineraries=flight_itineraries_schema(),
+    calendar=flight_calendar_schema(),
+    cancel_tickets=cancel_schema()
 )
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    cursor_pagination_class = FlightCursorPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
 
         if self.action == "list":
-            current_time = datetime.now()
+            current_time = timezone.now()
 
             queryset = (
                 queryset
@@ -137,31 +241,31 @@ class FlightViewSet(viewsets.ModelViewSet):
                 .annotate(
                     tickets_available=(
                         F("airplane__rows") * F("airplane__seats_in_row")
-                        - Count("tickets")
+                        - F("seats_sold")
                     )
                 )
             )
 
+            lookup = get_match_lookup(self.request.query_params)
+
             if from_city := self.request.query_params.get("from"):
-                queryset = queryset.filter(
-                    route__source__closest_big_city__icontains=from_city
-                )
+                queryset = queryset.filter(**{
+                    f"route__source__closest_big_city__{lookup}": from_city
+                })
 
             if to_city := self.request.query_params.get("to"):
-                queryset = queryset.filter(
-                    route__destination__closest_big_city__icontains=to_city
+                queryset = queryset.filter(**{
+                    f"route__destination__closest_big_city__{lookup}": to_city
+                })
+
+            for prefix in ("departure", "arrival"):
+                queryset = filter_time_window(
+                    queryset,
+                    f"{prefix}_time",
+                    self.request.query_params,
+                    prefix
                 )
 
-            if departure := self.request.query_params.get("departure_date"):
-                departure_date = datetime.strptime(departure, "%Y-%m-%d")
-                queryset = queryset.filter(
-                    departure_time__date=departure_date
-                )
-
-            if arrival := self.request.query_params.get("arrival_date"):
-                arrival_date = datetime.strptime(arrival, "%Y-%m-%d")
-                queryset = queryset.filter(arrival_time__date=arrival_date)
-
         if self.action == "retrieve":
             queryset = (
                 queryset
@@ -173,6 +277,9 @@ class FlightViewSet(viewsets.ModelViewSet):
                 .prefetch_related("crew")
             )
 
+        if self.action in ("seatmap", "holds"):
+            queryset = queryset.select_related("airplane")
+
         return queryset.distinct()
 
     def get_serializer_class(self):
@@ -182,21 +289,143 @@ class FlightViewSet(viewsets.ModelViewSet):
         if self.action == "retrieve":
             return FlightDetailSerializer
 
+        if self.action == "seatmap":
+            return FlightSeatMapSerializer
+
+        if self.action == "itineraries":
+            return ItinerarySerializer
+
+        if self.action == "calendar":
+            return FlightCalendarDaySerializer
+
+        if self.action == "holds":
+            if self.request.method == "POST":
+                return SeatHoldCreateSerializer
+            return SeatHoldSerializer
+
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        key, data = flight_cache.get_list(request)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        flights = queryset if page is None else page
+        serializer = self.get_serializer(flights, many=True)
+        if page is None:
+            response = Response(serializer.data)
+        else:
+            response = self.get_paginated_response(serializer.data)
+
+        flight_cache.set_list(
+            key, response.data, {flight.route_id for flight in flights}
+        )
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        flight_id = kwargs[self.lookup_field]
+        data = flight_cache.get_detail(flight_id)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = super(FlightViewSet, self).retrieve(
+            request, *args, **kwargs
+        )
+        flight_cache.set_detail(
+            flight_id, response.data["route"]["id"], response.data
+        )
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    @action(detail=True, methods=["get"])
+    def seatmap(self, request, pk=None):
+        encoding = request.query_params.get("encoding", "base64")
+        if encoding not in ENCODINGS:
+            encodings = ", ".join(ENCODINGS)
+            raise serializers.ValidationError(
+                {"encoding": f"Encoding must be one of: {encodings}"}
+            )
+
+        flight = self.get_object()
+        etag = seat_map_etag(flight, encoding)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        serializer = self.get_serializer(build_seat_map(flight, encoding))
+        return Response(serializer.data, headers={"ETag": etag})
+
+    @action(detail=False, methods=["get"])
+    def itineraries(self, request):
+        itineraries = find_itineraries(request.query_params)
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data)
+
+    def get_permissions(self):
+        if self.action == "holds":
+            return [IsAuthenticated()]
+        return super(FlightViewSet, self).get_permissions()
+
+    @action(detail=True, methods=["get", "post", "delete"])
+    def holds(self, request, pk=None):
+        flight = self.get_object()
+        holds = SeatHold.objects.filter(
+            flight=flight, user=request.user, expires_at__gt=timezone.now()
+        )
+
+        if request.method == "POST":
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            holds = hold_seats(
+                flight,
+                request.user,
+                serializer.validated_data["seats"],
+                serializer.validated_data["minutes"],
+            )
+            return Response(
+                SeatHoldSerializer(holds, many=True).data,
+                status=status.HTTP_201_CREATED
+            )
+
+        if request.method == "DELETE":
+            holds.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        return Response(self.get_serializer(holds, many=True).data)
+
+    @action(detail=True, methods=["post"], url_path="cancel-tickets")
+    def cancel_tickets(self, request, pk=None):
+        """Cancel every ticket of the flight, staff only"""
+        cancelled = cancel_flight(self.get_object())
+        return Response({"cancelled": cancelled})
 
+    @action(detail=False, methods=["get"])
+    def calendar(self, request):
+        serializer = self.get_serializer(
+            build_calendar(request.query_params), many=True
+        )
+        return Response(serializer.data)
+
+
+@extend_schema_view(
+    list=order_list_schema(),
+    create=order_create_schema(),
+    cancel=cancel_schema(request=OrderCancelSerializer)
+)
 class OrderViewSet(
+    CursorPaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Order.objects.prefetch_related(
-        "tickets__flight__route__source",
-        "tickets__flight__route__destination",
-        "tickets__flight__airplane"
-    )
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
+    cursor_pagination_class = OrderCursorPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -206,7 +435,86 @@ class OrderViewSet(
         if self.action == "list":
             return OrderListSerializer
 
+        if self.action == "cancel":
+            return OrderCancelSerializer
+
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """Render orders from plain column values, see serialize_orders"""
+        queryset = order_rows(request.user)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_orders(page))
+
+        return Response(serialize_orders(queryset))
+
+    def create(self, request, *args, **kwargs):
+        if prefers_async(request):
+            return idempotent_create(request, lambda: self.enqueue(request))
+        return idempotent_create(
+            request,
+            lambda: super(OrderViewSet, self).create(request, *args, **kwargs)
+        )
+
+    def enqueue(self, request):
+        """Queue the order for process_order_queue workers"""
+        serializer = OrderRequestSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        order_request = serializer.save(user=request.user)
+        return Response(
+            serializer.data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={
+                "Location": reverse(
+                    "airport:orderrequest-detail",
+                    args=[order_request.id],
+                    request=request,
+                ),
+                "Preference-Applied": "respond-async",
+            },
+        )
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """Cancel the order or only the listed tickets of it"""
+        order = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cancelled = cancel_order(
+            order, serializer.validated_data.get("tickets")
+        )
+        return Response({"cancelled": cancelled})
+
+
+class OrderRequestViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = OrderRequest.objects.all()
+    serializer_class = OrderRequestSerializer
+    pagination_class = OrderPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+@extend_schema_view(
+    retrieve=export_schema()
+)
+class ExportViewSet(viewsets.ViewSet):
+    """Staff-only streaming dumps of flights, orders and tickets"""
+
+    permission_classes = (IsAdminUser,)
+    lookup_field = "name"
+    lookup_value_regex = "|".join(EXPORTS)
+
+    def retrieve(self, request, name=None):
+        return export_response(name, request.query_params)
@@ -24,9 +24,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
 # SECURITY WARNING: don"t run with debug turned on in production!
-DEBUG = os.environ.get("DEBUG", False)
+DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true")
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.environ.get(
+    "ALLOWED_HOSTS", "localhost,127.0.0.1"
+).split(",")
 
 
 # Application definition
@@ -41,14 +43,14 @@ INSTALLED_APPS = [
     "rest_framework",
     "drf_spectacular",
     "rest_framework_simplejwt",
-    "debug_toolbar",
     "user",
     "airport"
 ]
 
 MIDDLEWARE = [
+    "airport.metrics.MetricsMiddleware",
+    "airport.n_plus_one.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,6 +59,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(3, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -90,6 +96,60 @@ DATABASES = {"default": {
     "PORT": os.environ["POSTGRES_PORT"], }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": (
+            os.environ.get("CACHE_BACKEND")
+            or "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+FLIGHT_CACHE_ALIAS = "default"
+
+# Cache versions are bumped by every process that sells or changes
+# flights, so caching stays off until CACHE_BACKEND is a shared cache
+FLIGHT_CACHE_TIMEOUT = int(
+    os.environ.get("FLIGHT_CACHE_TIMEOUT")
+    or (300 if os.environ.get("CACHE_BACKEND") else 0)
+)
+
+BOOKING_LOCK_STRATEGY = os.environ.get(
+    "BOOKING_LOCK_STRATEGY", "select_for_update"
+)
+
+BOOKING_MAX_RETRIES = 3
+
+BOOKING_RETRY_DELAY = 0.05
+
+EXPORT_CHUNK_SIZE = 2000
+
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+ORDER_INTAKE_ASYNC = os.environ.get("ORDER_INTAKE_ASYNC", "").lower() in (
+    "1", "true"
+)
+
+ORDER_QUEUE_CLAIM_TIMEOUT = 300
+
+SEAT_HOLD_MINUTES = 10
+
+SEAT_HOLD_MAX_MINUTES = 30
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in (
+    "1", "true"
+)
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+N_PLUS_ONE_SAMPLE_RATE = float(os.environ.get("N_PLUS_ONE_SAMPLE_RATE") or 0)
+
+N_PLUS_ONE_THRESHOLD = 5
+
 AUTH_USER_MODEL = "user.User"
 
 # Password validation
@@ -151,6 +211,15 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "airport.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "airport.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "PAGE_SIZE": 5,
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",